@@ -1,9 +1,13 @@
-import os
-from typing import List
-from openai import OpenAI
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+from app.config import CURATOR_BATCH_SIZE, CURATOR_CONCURRENCY, CURATOR_RERANK_TOP
+from app.agent.llm import get_scheduler
+from app.database.repository import Repository
+
 load_dotenv()
 
 
@@ -18,6 +22,16 @@ class RankedDigestList(BaseModel):
     articles: List[RankedArticle] = Field(description="List of ranked articles")
 
 
+class ScoredArticle(BaseModel):
+    digest_id: str = Field(description="The ID of the digest (article_type:article_id)")
+    relevance_score: float = Field(description="Relevance score from 0.0 to 10.0", ge=0.0, le=10.0)
+    reasoning: str = Field(description="Brief explanation of the score")
+
+
+class ScoredDigestList(BaseModel):
+    articles: List[ScoredArticle] = Field(description="List of scored articles")
+
+
 CURATOR_PROMPT = """You are an expert AI news curator specializing in personalized content ranking for AI professionals.
 
 Your role is to analyze and rank AI-related news articles, research papers, and video content based on a user's specific profile, interests, and background.
@@ -38,13 +52,16 @@ Scoring Guidelines:
 
 Rank articles from most relevant (rank 1) to least relevant. Ensure each article has a unique rank."""
 
+SCORING_INSTRUCTIONS = """You are scoring one batch out of many. Other batches are scored separately and all scores are merged afterwards, so score every article on the absolute scale above, independently of the other articles in this batch. Do not rank; return exactly one score for every ID you are given."""
+
 
 class CuratorAgent:
     def __init__(self, user_profile: dict):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.llm = get_scheduler()
         self.model = "gpt-5.1"
         self.user_profile = user_profile
         self.system_prompt = self._build_system_prompt()
+        self.profile_version = self._build_profile_version()
 
     def _build_system_prompt(self) -> str:
         interests = "\n".join(f"- {interest}" for interest in self.user_profile["interests"])
@@ -64,23 +81,26 @@ Interests:
 Preferences:
 {pref_text}"""
 
-    def rank_digests(self, digests: List[dict]) -> List[RankedArticle]:
-        if not digests:
-            return []
-        
-        digest_list = "\n\n".join([
+    def _build_profile_version(self) -> str:
+        payload = f"{self.model}\n{self.system_prompt}\n{SCORING_INSTRUCTIONS}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _format_digests(self, digests: List[dict]) -> str:
+        return "\n\n".join([
             f"ID: {d['id']}\nTitle: {d['title']}\nSummary: {d['summary']}\nType: {d['article_type']}"
             for d in digests
         ])
-        
+
+    def _rank_single(self, digests: List[dict]) -> List[RankedArticle]:
         user_prompt = f"""Rank these {len(digests)} AI news digests based on the user profile:
 
-{digest_list}
+{self._format_digests(digests)}
 
 Provide a relevance score (0.0-10.0) and rank (1-{len(digests)}) for each article, ordered from most to least relevant."""
 
         try:
-            response = self.client.responses.parse(
+            response = self.llm.parse(
+                "curator",
                 model=self.model,
                 instructions=self.system_prompt,
                 temperature=0.3,
@@ -93,3 +113,92 @@ Provide a relevance score (0.0-10.0) and rank (1-{len(digests)}) for each articl
         except Exception as e:
             print(f"Error ranking digests: {e}")
             return []
+
+    def _score_batch(self, digests: List[dict]) -> List[ScoredArticle]:
+        user_prompt = f"""Score these {len(digests)} AI news digests based on the user profile:
+
+{self._format_digests(digests)}
+
+Provide a relevance score (0.0-10.0) and brief reasoning for each article."""
+
+        try:
+            response = self.llm.parse(
+                "curator",
+                model=self.model,
+                instructions=f"{self.system_prompt}\n\n{SCORING_INSTRUCTIONS}",
+                temperature=0.3,
+                input=user_prompt,
+                text_format=ScoredDigestList
+            )
+            
+            scored_list = response.output_parsed
+            ids = {d["id"] for d in digests}
+            return [a for a in scored_list.articles if a.digest_id in ids] if scored_list else []
+        except Exception as e:
+            print(f"Error scoring digests: {e}")
+            return []
+
+    def score_digests(self, digests: List[dict], batch_size: int = CURATOR_BATCH_SIZE) -> List[ScoredArticle]:
+        scores: Dict[str, ScoredArticle] = {}
+        remaining = digests
+        for _ in range(2):
+            batches = [remaining[i:i + batch_size] for i in range(0, len(remaining), batch_size)]
+            if not batches:
+                break
+            with ThreadPoolExecutor(max_workers=min(CURATOR_CONCURRENCY, len(batches))) as executor:
+                for batch_scores in executor.map(self._score_batch, batches):
+                    for scored in batch_scores:
+                        scores.setdefault(scored.digest_id, scored)
+            remaining = [d for d in digests if d["id"] not in scores]
+        return sorted(scores.values(), key=lambda a: a.relevance_score, reverse=True)
+
+    def _order(self, digests: List[dict], scored: List[ScoredArticle], rerank_top: Optional[int] = None) -> List[RankedArticle]:
+        rerank_top = CURATOR_RERANK_TOP if rerank_top is None else rerank_top
+        
+        if rerank_top > 1 and scored:
+            by_id = {d["id"]: d for d in digests}
+            candidate_ids = list(dict.fromkeys(a.digest_id for a in scored[:rerank_top]))
+            head = self._rank_single([by_id[digest_id] for digest_id in candidate_ids])
+            head = sorted({a.digest_id: a for a in head if a.digest_id in candidate_ids}.values(), key=lambda a: a.rank)
+            head_ids = {a.digest_id for a in head}
+            tail = [a for a in scored if a.digest_id not in head_ids]
+            ordered = [(a.digest_id, a.relevance_score, a.reasoning) for a in head]
+            ordered += [(a.digest_id, a.relevance_score, a.reasoning) for a in tail]
+        else:
+            ordered = [(a.digest_id, a.relevance_score, a.reasoning) for a in scored]
+        
+        return [
+            RankedArticle(digest_id=digest_id, relevance_score=score, rank=rank, reasoning=reasoning)
+            for rank, (digest_id, score, reasoning) in enumerate(ordered, 1)
+        ]
+
+    def rank_digests(self, digests: List[dict], rerank_top: Optional[int] = None) -> List[RankedArticle]:
+        if not digests:
+            return []
+        
+        if len(digests) <= CURATOR_BATCH_SIZE:
+            return self._rank_single(digests)
+        
+        return self._order(digests, self.score_digests(digests), rerank_top)
+
+    def rank_digests_incremental(self, repo: Repository, digests: List[dict],
+                                 rerank_top: Optional[int] = None) -> Tuple[List[RankedArticle], Dict[str, int]]:
+        if not digests:
+            return [], {"stored": 0, "scored": 0}
+        
+        stored = repo.get_curator_scores([d["id"] for d in digests], self.profile_version)
+        unscored = [d for d in digests if d["id"] not in stored]
+        if unscored:
+            fresh = self.score_digests(unscored)
+            repo.save_curator_scores(self.profile_version, self.model, [
+                {"digest_id": a.digest_id, "relevance_score": a.relevance_score, "reasoning": a.reasoning}
+                for a in fresh
+            ])
+            stored.update({a.digest_id: (a.relevance_score, a.reasoning) for a in fresh})
+        
+        scored = sorted(
+            (ScoredArticle(digest_id=digest_id, relevance_score=score, reasoning=reasoning or "")
+             for digest_id, (score, reasoning) in stored.items()),
+            key=lambda a: (-a.relevance_score, a.digest_id)
+        )
+        return self._order(digests, scored, rerank_top), {"stored": len(digests) - len(unscored), "scored": len(unscored)}
@@ -1,16 +1,36 @@
-import os
-from typing import Optional
-from openai import OpenAI
+import asyncio
+import json
+import logging
+import math
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
+from app.config import DIGEST_SINGLE_CALL_TOKENS, DIGEST_CHUNK_TOKENS, DIGEST_CHUNK_OVERLAP, DIGEST_MAX_CHUNKS
+from app.agent.llm import LLMScheduler, TokenBudgetExceeded, get_scheduler
+from app.agent.llm_cache import LLMCache
+from app.agent.tokens import count_tokens, split_tokens, truncate_tokens
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class DigestOutput(BaseModel):
     title: str
     summary: str
 
+
+class ChunkSummary(BaseModel):
+    summary: str
+
+
+PROMPT_VERSION = "2"
+BATCH_ENDPOINT = "/v1/responses"
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
 PROMPT = """You are an expert AI news analyst specializing in summarizing technical articles, research papers, and video content about artificial intelligence.
 
 Your role is to create concise, informative digests that help readers quickly understand the key points and significance of AI-related content.
@@ -22,27 +42,199 @@ Guidelines:
 - Use clear, accessible language while maintaining technical accuracy
 - Avoid marketing fluff - focus on substance"""
 
+CHUNK_PROMPT = """You are an expert AI news analyst. You will receive one section of a longer article, research paper, or video transcript about artificial intelligence.
+
+Summarize the key facts, claims, results, and announcements in this section in 3-5 sentences. Keep concrete names, numbers, and technical details. Do not add an introduction or commentary about the section itself."""
+
 
 class DigestAgent:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, cache: Optional[LLMCache] = None, llm: Optional[LLMScheduler] = None):
+        self.cache = cache
+        self.llm = llm or get_scheduler()
         self.model = "gpt-4o-mini"
         self.system_prompt = PROMPT
 
-    def generate_digest(self, title: str, content: str, article_type: str) -> Optional[DigestOutput]:
+    @property
+    def client(self):
+        return self.llm.client
+
+    def _build_prompt(self, title: str, content: str, article_type: str) -> str:
+        return f"Create a digest for this {article_type}: \n Title: {title} \n Content: {content}"
+
+    def _build_reduce_prompt(self, title: str, partials: List[str], article_type: str) -> str:
+        sections = "\n".join(f"{idx}. {summary}" for idx, summary in enumerate(partials, 1))
+        return self._build_prompt(title, f"Summaries of consecutive sections:\n{sections}", article_type)
+
+    def _build_chunk_prompt(self, title: str, chunk: str, idx: int, total: int) -> str:
+        return f"Title: {title} \n Section {idx} of {total}: \n {chunk}"
+
+    def _split_content(self, content: str) -> List[str]:
+        total_tokens = count_tokens(content)
+        if total_tokens <= DIGEST_SINGLE_CALL_TOKENS:
+            return [content]
+        chunk_tokens = max(DIGEST_CHUNK_TOKENS, math.ceil(total_tokens / DIGEST_MAX_CHUNKS) + DIGEST_CHUNK_OVERLAP)
+        return split_tokens(content, chunk_tokens, DIGEST_CHUNK_OVERLAP)
+
+    def _parse(self, instructions: str, user_prompt: str, text_format):
+        response = self.llm.parse(
+            "digest",
+            model=self.model,
+            instructions=instructions,
+            temperature=0.7,
+            input=user_prompt,
+            text_format=text_format
+        )
+        return response.output_parsed
+
+    async def _aparse(self, instructions: str, user_prompt: str, text_format):
+        response = await self.llm.aparse(
+            "digest",
+            model=self.model,
+            instructions=instructions,
+            temperature=0.7,
+            input=user_prompt,
+            text_format=text_format
+        )
+        return response.output_parsed
+
+    def _summarize_chunk(self, title: str, chunk: str, idx: int, total: int) -> Optional[str]:
+        try:
+            result = self._parse(CHUNK_PROMPT, self._build_chunk_prompt(title, chunk, idx, total), ChunkSummary)
+            return result.summary if result else None
+        except TokenBudgetExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Error summarizing chunk {idx}/{total}: {e}")
+            return None
+
+    async def _asummarize_chunk(self, title: str, chunk: str, idx: int, total: int) -> Optional[str]:
         try:
-            user_prompt = f"Create a digest for this {article_type}: \n Title: {title} \n Content: {content[:8000]}"
-
-            response = self.client.responses.parse(
-                model=self.model,
-                instructions=self.system_prompt,
-                temperature=0.7,
-                input=user_prompt,
-                text_format=DigestOutput
-            )
-            
-            return response.output_parsed
+            result = await self._aparse(CHUNK_PROMPT, self._build_chunk_prompt(title, chunk, idx, total), ChunkSummary)
+            return result.summary if result else None
+        except TokenBudgetExceeded:
+            raise
         except Exception as e:
-            print(f"Error generating digest: {e}")
+            logger.error(f"Error summarizing chunk {idx}/{total}: {e}")
+            return None
+
+    def get_cached_digest(self, title: str, content: str) -> Optional[DigestOutput]:
+        if self.cache is None:
             return None
+        cached = self.cache.get(self.model, PROMPT_VERSION, f"{title}\n{content}")
+        return DigestOutput.model_validate_json(cached) if cached else None
+
+    def cache_digest(self, title: str, content: str, digest: Optional[DigestOutput]) -> None:
+        if self.cache is not None and digest is not None:
+            self.cache.put(self.model, PROMPT_VERSION, f"{title}\n{content}", digest.model_dump_json())
+
+    def generate_digest(self, title: str, content: str, article_type: str) -> Optional[DigestOutput]:
+        cached = self.get_cached_digest(title, content)
+        if cached:
+            return cached
+        chunks = self._split_content(content)
+        if len(chunks) == 1:
+            digest = self._parse(self.system_prompt, self._build_prompt(title, content, article_type), DigestOutput)
+        else:
+            with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                partials = list(executor.map(
+                    lambda args: self._summarize_chunk(title, args[1], args[0], len(chunks)),
+                    enumerate(chunks, 1)
+                ))
+            partials = [p for p in partials if p]
+            if not partials:
+                return None
+            digest = self._parse(self.system_prompt, self._build_reduce_prompt(title, partials, article_type), DigestOutput)
+        
+        self.cache_digest(title, content, digest)
+        return digest
+
+    async def agenerate_digest(self, title: str, content: str, article_type: str) -> Optional[DigestOutput]:
+        cached = self.get_cached_digest(title, content)
+        if cached:
+            return cached
+        chunks = self._split_content(content)
+        if len(chunks) == 1:
+            digest = await self._aparse(self.system_prompt, self._build_prompt(title, content, article_type), DigestOutput)
+        else:
+            try:
+                async with asyncio.TaskGroup() as group:
+                    tasks = [
+                        group.create_task(self._asummarize_chunk(title, chunk, idx, len(chunks)))
+                        for idx, chunk in enumerate(chunks, 1)
+                    ]
+            except* TokenBudgetExceeded as errors:
+                raise errors.exceptions[0] from None
+            partials = [task.result() for task in tasks if task.result()]
+            if not partials:
+                return None
+            digest = await self._aparse(self.system_prompt, self._build_reduce_prompt(title, partials, article_type), DigestOutput)
+        
+        self.cache_digest(title, content, digest)
+        return digest
+
+    def _batch_text_format(self) -> dict:
+        schema = DigestOutput.model_json_schema()
+        schema["additionalProperties"] = False
+        return {"format": {"type": "json_schema", "name": "DigestOutput", "schema": schema, "strict": True}}
+
+    def build_batch_request(self, article: dict) -> dict:
+        return {
+            "custom_id": f"{article['type']}:{article['id']}",
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": self.model,
+                "instructions": self.system_prompt,
+                "temperature": 0.7,
+                "input": self._build_prompt(
+                    article["title"],
+                    truncate_tokens(article["content"], DIGEST_SINGLE_CALL_TOKENS),
+                    article["type"]
+                ),
+                "text": self._batch_text_format()
+            }
+        }
+
+    def submit_batch(self, articles: Iterable[dict]) -> Tuple[Optional[object], int]:
+        count = 0
+        with tempfile.TemporaryFile() as jsonl:
+            for article in articles:
+                jsonl.write(json.dumps(self.build_batch_request(article)).encode("utf-8") + b"\n")
+                count += 1
+            if count == 0:
+                return None, 0
+            jsonl.seek(0)
+            input_file = self.client.files.create(file=("digests.jsonl", jsonl), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h"
+        )
+        return batch, count
+
+    def retrieve_batch(self, batch_id: str):
+        return self.client.batches.retrieve(batch_id)
 
+    def read_batch_output(self, file_id: str) -> Dict[str, Optional[DigestOutput]]:
+        results: Dict[str, Optional[DigestOutput]] = {}
+        for line in self.client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            custom_id = record.get("custom_id")
+            response = record.get("response") or {}
+            results[custom_id] = None
+            if response.get("status_code") != 200:
+                continue
+            try:
+                text = next(
+                    part["text"]
+                    for item in response["body"].get("output", [])
+                    if item.get("type") == "message"
+                    for part in item.get("content", [])
+                    if part.get("type") == "output_text"
+                )
+                results[custom_id] = DigestOutput.model_validate_json(text)
+            except Exception as e:
+                logger.error(f"Error parsing batch result {custom_id}: {e}")
+        return results
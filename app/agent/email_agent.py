@@ -1,10 +1,10 @@
-import os
 from datetime import datetime
 from typing import List, Optional
-from openai import OpenAI
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+from app.agent.llm import get_scheduler
+
 load_dotenv()
 
 
@@ -63,7 +63,7 @@ Keep it concise (2-3 sentences for the introduction), friendly, and professional
 
 class EmailAgent:
     def __init__(self, user_profile: dict):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.llm = get_scheduler()
         self.model = "gpt-4o-mini"
         self.user_profile = user_profile
 
@@ -89,7 +89,8 @@ Top 10 ranked articles:
 Generate a greeting and introduction that previews these articles."""
 
         try:
-            response = self.client.responses.parse(
+            response = self.llm.parse(
+                "email",
                 model=self.model,
                 instructions=EMAIL_PROMPT,
                 temperature=0.7,
@@ -0,0 +1,164 @@
+import hashlib
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from app.config import EMBEDDING_BACKEND, EMBEDDING_MODEL, CURATOR_PREFILTER_TOP_K
+from app.agent.llm import get_scheduler
+from app.database.repository import Repository
+
+
+EMBEDDING_BATCH_SIZE = 256
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class OpenAIEmbedder:
+    def __init__(self, model: str = EMBEDDING_MODEL):
+        self.model = model
+        self.llm = get_scheduler()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = []
+        for i in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            response = self.llm.embed("embedding", self.model, texts[i:i + EMBEDDING_BATCH_SIZE])
+            vectors.extend(item.embedding for item in response.data)
+        return normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+
+class HashingEmbedder:
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+        self.model = f"hashing-{dimensions}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"[a-z0-9]+", text.lower()):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                matrix[row, value % self.dimensions] += 1.0 if value & (1 << 63) else -1.0
+        return normalize_rows(matrix)
+
+
+def get_embedder(backend: str = EMBEDDING_BACKEND):
+    if backend == "hashing":
+        return HashingEmbedder()
+    return OpenAIEmbedder()
+
+
+def digest_text(digest: dict) -> str:
+    return f"{digest['title']}\n{digest['summary']}"
+
+
+def profile_text(profile: dict) -> str:
+    interests = "\n".join(profile["interests"])
+    return f"{profile['background']}\n{interests}"
+
+
+def profile_version(profile: dict) -> str:
+    return hashlib.sha256(profile_text(profile).encode("utf-8")).hexdigest()[:16]
+
+
+class RelevancePrefilter:
+    def __init__(self, embedder=None):
+        self.embedder = embedder or get_embedder()
+        self._profile_vectors: Dict[str, np.ndarray] = {}
+
+    def embed_digests(self, repo: Repository, digests: List[dict]) -> np.ndarray:
+        ids = [d["id"] for d in digests]
+        cached = repo.get_digest_embeddings(ids, self.embedder.model)
+        missing = [d for d in digests if d["id"] not in cached]
+        if missing:
+            vectors = self.embedder.embed([digest_text(d) for d in missing])
+            fresh = {d["id"]: vector.astype(np.float32).tobytes() for d, vector in zip(missing, vectors)}
+            repo.save_digest_embeddings(self.embedder.model, fresh)
+            cached.update(fresh)
+        return np.vstack([np.frombuffer(cached[digest_id], dtype=np.float32) for digest_id in ids])
+
+    def embed_profiles(self, profiles: List[dict]) -> np.ndarray:
+        texts = [profile_text(p) for p in profiles]
+        missing = list(dict.fromkeys(t for t in texts if t not in self._profile_vectors))
+        if missing:
+            self._profile_vectors.update(zip(missing, self.embedder.embed(missing)))
+        return np.vstack([self._profile_vectors[t] for t in texts])
+
+    def embed_profile(self, profile: dict) -> np.ndarray:
+        return self.embed_profiles([profile])[0]
+
+    def score(self, repo: Repository, digests: List[dict], profile: dict) -> np.ndarray:
+        if not digests:
+            return np.zeros(0, dtype=np.float32)
+        return self.embed_digests(repo, digests) @ self.embed_profile(profile)
+
+    def top_k(self, repo: Repository, digests: List[dict], profile: dict, k: int,
+              scores: Optional[np.ndarray] = None) -> List[dict]:
+        if k <= 0 or len(digests) <= k:
+            return digests
+        scores = self.score(repo, digests, profile) if scores is None else scores
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [digests[i] for i in top]
+
+    def top_k_per_profile(self, repo: Repository, digests: List[dict], profiles: List[dict], k: int) -> List[List[dict]]:
+        if k <= 0 or len(digests) <= k:
+            return [digests for _ in profiles]
+        if not profiles:
+            return []
+        return top_k_columns(digests, self.embed_digests(repo, digests) @ self.embed_profiles(profiles).T, k)
+
+
+def top_k_columns(digests: List[dict], scores: np.ndarray, k: int) -> List[List[dict]]:
+    top = np.argpartition(-scores, k - 1, axis=0)[:k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=0), axis=0)
+    top = np.take_along_axis(top, order, axis=0)
+    return [[digests[i] for i in top[:, column]] for column in range(scores.shape[1])]
+
+
+_prefilters: Dict[str, Tuple[str, RelevancePrefilter]] = {}
+_prefilters_lock = threading.Lock()
+
+
+def get_prefilter(profile: dict) -> RelevancePrefilter:
+    profile_id, version = profile.get("id", profile["name"]), profile_version(profile)
+    with _prefilters_lock:
+        cached = _prefilters.get(profile_id)
+        if cached is None or cached[0] != version:
+            cached = _prefilters[profile_id] = (version, RelevancePrefilter())
+        return cached[1]
+
+
+def prefilter_digests(repo: Repository, digests: List[dict], profile: dict,
+                      k: int = CURATOR_PREFILTER_TOP_K) -> List[dict]:
+    if k <= 0 or len(digests) <= k:
+        return digests
+    try:
+        return get_prefilter(profile).top_k(repo, digests, profile, k)
+    except Exception as e:
+        repo.session.rollback()
+        print(f"Error prefiltering digests, ranking all of them: {e}")
+        return digests
+
+
+def prefilter_digests_per_profile(repo: Repository, digests: List[dict], profiles: List[dict],
+                                  k: int = CURATOR_PREFILTER_TOP_K) -> List[List[dict]]:
+    if k <= 0 or len(digests) <= k:
+        return [digests for _ in profiles]
+    if not profiles:
+        return []
+    prefilters = [get_prefilter(profile) for profile in profiles]
+    texts = [profile_text(profile) for profile in profiles]
+    missing = list(dict.fromkeys(
+        text for prefilter, text in zip(prefilters, texts) if text not in prefilter._profile_vectors
+    ))
+    if missing:
+        vectors = dict(zip(missing, prefilters[0].embedder.embed(missing)))
+        for prefilter, text in zip(prefilters, texts):
+            if text in vectors:
+                prefilter._profile_vectors.setdefault(text, vectors[text])
+    profile_vectors = np.vstack([prefilter._profile_vectors[text] for prefilter, text in zip(prefilters, texts)])
+    return top_k_columns(digests, prefilters[0].embed_digests(repo, digests) @ profile_vectors.T, k)
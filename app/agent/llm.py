@@ -0,0 +1,258 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.config import (
+    LLM_RPM, LLM_TPM, LLM_MAX_RETRIES, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX,
+    LLM_OUTPUT_TOKEN_ESTIMATE, LLM_RUN_TOKEN_BUDGET, LLM_BUDGET_RESERVE
+)
+from app.agent.telemetry import LLMTelemetry
+from app.agent.tokens import count_tokens
+from app.rate_limit import TokenBucket, get_bucket
+
+STAGE_PRIORITIES = {"email": 0, "curator": 1, "embedding": 1, "digest": 2}
+LOWEST_PRIORITY = max(STAGE_PRIORITIES.values())
+PRIORITY_POLL_SECONDS = 0.05
+MAX_WAIT_SECONDS = 1.0
+
+
+class TokenBudgetExceeded(Exception):
+    pass
+
+
+def _is_retryable(error: Exception) -> bool:
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+    return isinstance(error, (APIConnectionError, InternalServerError, RateLimitError))
+
+
+def _retry_after(error: Exception) -> float:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _usage_tokens(response, estimate: int) -> int:
+    usage = getattr(response, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    return total if total is not None else estimate
+
+
+class LLMScheduler:
+    def __init__(self, rpm: int = LLM_RPM, tpm: int = LLM_TPM, max_retries: int = LLM_MAX_RETRIES,
+                 token_budget: int = LLM_RUN_TOKEN_BUDGET, budget_reserve: int = LLM_BUDGET_RESERVE):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.token_budget = token_budget
+        self.budget_reserve = budget_reserve
+        self.used_tokens = 0
+        self.exhausted_stages: Set[str] = set()
+        self.telemetry = LLMTelemetry()
+        self._lock = threading.Lock()
+        self._waiting: Dict[Tuple[str, int], int] = defaultdict(int)
+        self._client = None
+        self._async_client = None
+        self._async_loop = None
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from openai import OpenAI
+                self._client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+            return self._client
+
+    @property
+    def async_client(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._async_client is None or (self._async_loop is not None and self._async_loop is not loop):
+                from openai import AsyncOpenAI
+                self._async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+                self._async_loop = loop
+            return self._async_client
+
+    def install_clients(self, client, async_client=None) -> None:
+        with self._lock:
+            self._client = client
+            self._async_client = async_client or client
+            self._async_loop = None
+
+    def start_run(self, token_budget: Optional[int] = None) -> None:
+        with self._lock:
+            self.used_tokens = 0
+            self.exhausted_stages.clear()
+            if token_budget is not None:
+                self.token_budget = token_budget
+        self.telemetry.start_run()
+
+    def _stage_limit(self, stage: str) -> Optional[int]:
+        if self.token_budget <= 0:
+            return None
+        priority = STAGE_PRIORITIES.get(stage, LOWEST_PRIORITY)
+        return max(0, self.token_budget - self.budget_reserve * priority // LOWEST_PRIORITY)
+
+    def budget_exhausted(self, stage: str) -> bool:
+        limit = self._stage_limit(stage)
+        return limit is not None and (stage in self.exhausted_stages or self.used_tokens >= limit)
+
+    def _charge(self, stage: str, estimate: int) -> None:
+        with self._lock:
+            limit = self._stage_limit(stage)
+            if limit is not None and self.used_tokens + estimate > limit:
+                self.exhausted_stages.add(stage)
+                raise TokenBudgetExceeded(
+                    f"{stage} call needs ~{estimate} tokens but {self.used_tokens}/{limit} "
+                    f"of the run budget is already used"
+                )
+            self.used_tokens += estimate
+
+    def _settle(self, model: str, estimate: int, actual: int) -> None:
+        with self._lock:
+            self.used_tokens += actual - estimate
+        self._buckets(model)[1].credit(estimate - actual)
+
+    def _buckets(self, model: str) -> Tuple[TokenBucket, TokenBucket]:
+        return (
+            get_bucket(f"llm:{model}:requests", self.rpm / 60, self.rpm),
+            get_bucket(f"llm:{model}:tokens", self.tpm / 60, self.tpm)
+        )
+
+    def _try_reserve(self, model: str, priority: int, tokens: int) -> float:
+        with self._lock:
+            if any(self._waiting[(model, p)] for p in range(priority)):
+                return PRIORITY_POLL_SECONDS
+        requests, token_bucket = self._buckets(model)
+        wait = requests.try_acquire(1)
+        if wait > 0:
+            return wait
+        wait = token_bucket.try_acquire(min(tokens, token_bucket.capacity))
+        if wait > 0:
+            requests.credit(1)
+        return wait
+
+    def _release(self, model: str, tokens: int) -> None:
+        token_bucket = self._buckets(model)[1]
+        token_bucket.credit(min(tokens, token_bucket.capacity))
+
+    def _set_waiting(self, key: Tuple[str, int], delta: int) -> None:
+        with self._lock:
+            self._waiting[key] += delta
+
+    def _acquire(self, stage: str, model: str, tokens: int) -> None:
+        key = (model, STAGE_PRIORITIES.get(stage, LOWEST_PRIORITY))
+        self._set_waiting(key, 1)
+        try:
+            while (wait := self._try_reserve(model, key[1], tokens)) > 0:
+                time.sleep(min(wait, MAX_WAIT_SECONDS))
+        finally:
+            self._set_waiting(key, -1)
+
+    async def _aacquire(self, stage: str, model: str, tokens: int) -> None:
+        key = (model, STAGE_PRIORITIES.get(stage, LOWEST_PRIORITY))
+        self._set_waiting(key, 1)
+        try:
+            while (wait := self._try_reserve(model, key[1], tokens)) > 0:
+                await asyncio.sleep(min(wait, MAX_WAIT_SECONDS))
+        finally:
+            self._set_waiting(key, -1)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+        return max(delay, _retry_after(error))
+
+    def _record(self, stage: str, model: str, started_at: datetime, start: float, queued: float,
+                retries: int, response=None, error: Optional[Exception] = None) -> None:
+        self.telemetry.record(
+            stage=stage,
+            model=model,
+            started_at=started_at,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            queue_ms=queued * 1000,
+            retries=retries,
+            response=response,
+            error=error
+        )
+
+    def call(self, stage: str, model: str, estimate: int, request: Callable[[], object]):
+        self._charge(stage, estimate)
+        started_at, start, queued = datetime.now(timezone.utc), time.perf_counter(), 0.0
+        for attempt in range(self.max_retries + 1):
+            wait_start = time.perf_counter()
+            self._acquire(stage, model, estimate)
+            queued += time.perf_counter() - wait_start
+            try:
+                response = request()
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    self._settle(model, estimate, 0)
+                    self._record(stage, model, started_at, start, queued, attempt, error=e)
+                    raise
+                self._release(model, estimate)
+                delay = self._backoff(attempt, e)
+                print(f"Retrying {stage} call to {model} in {delay:.1f}s after error: {e}")
+                time.sleep(delay)
+                continue
+            self._settle(model, estimate, _usage_tokens(response, estimate))
+            self._record(stage, model, started_at, start, queued, attempt, response=response)
+            return response
+
+    async def acall(self, stage: str, model: str, estimate: int, request: Callable[[], Awaitable[object]]):
+        self._charge(stage, estimate)
+        started_at, start, queued = datetime.now(timezone.utc), time.perf_counter(), 0.0
+        for attempt in range(self.max_retries + 1):
+            wait_start = time.perf_counter()
+            await self._aacquire(stage, model, estimate)
+            queued += time.perf_counter() - wait_start
+            try:
+                response = await request()
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    self._settle(model, estimate, 0)
+                    self._record(stage, model, started_at, start, queued, attempt, error=e)
+                    raise
+                self._release(model, estimate)
+                delay = self._backoff(attempt, e)
+                print(f"Retrying {stage} call to {model} in {delay:.1f}s after error: {e}")
+                await asyncio.sleep(delay)
+                continue
+            self._settle(model, estimate, _usage_tokens(response, estimate))
+            self._record(stage, model, started_at, start, queued, attempt, response=response)
+            return response
+
+    def _estimate_parse(self, kwargs: dict) -> int:
+        return count_tokens(kwargs.get("instructions") or "") + count_tokens(kwargs["input"]) + LLM_OUTPUT_TOKEN_ESTIMATE
+
+    def parse(self, stage: str, **kwargs):
+        return self.call(stage, kwargs["model"], self._estimate_parse(kwargs),
+                         lambda: self.client.responses.parse(**kwargs))
+
+    async def aparse(self, stage: str, **kwargs):
+        return await self.acall(stage, kwargs["model"], self._estimate_parse(kwargs),
+                                lambda: self.async_client.responses.parse(**kwargs))
+
+    def embed(self, stage: str, model: str, texts: List[str]):
+        estimate = sum(count_tokens(text) for text in texts)
+        return self.call(stage, model, estimate,
+                         lambda: self.client.embeddings.create(model=model, input=texts))
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    return _scheduler
@@ -0,0 +1,58 @@
+import hashlib
+from typing import Optional
+
+from app.config import LLM_CACHE_TTL_HOURS, LLM_CACHE_MAX_ENTRIES
+from app.database.repository import Repository
+
+
+def normalize_content(text: str) -> str:
+    return " ".join(text.split())
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_content(text).encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, repo: Repository, ttl_hours: int = LLM_CACHE_TTL_HOURS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.repo = repo
+        self.ttl_hours = ttl_hours
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, model: str, prompt_version: str, digest: str) -> str:
+        return hashlib.sha256(f"{model}|{prompt_version}|{digest}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt_version: str, content: str) -> Optional[str]:
+        try:
+            response = self.repo.get_llm_cache_entry(self._key(model, prompt_version, content_hash(content)), self.ttl_hours)
+        except Exception as e:
+            self.repo.session.rollback()
+            print(f"Error reading LLM cache: {e}")
+            response = None
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def put(self, model: str, prompt_version: str, content: str, response: str) -> None:
+        digest = content_hash(content)
+        try:
+            self.repo.put_llm_cache_entry(self._key(model, prompt_version, digest), model, prompt_version, digest, response)
+        except Exception as e:
+            self.repo.session.rollback()
+            print(f"Error writing LLM cache: {e}")
+
+    def evict(self) -> int:
+        return self.repo.evict_llm_cache(self.ttl_hours, self.max_entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
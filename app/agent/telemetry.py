@@ -0,0 +1,120 @@
+import math
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-5.1": (1.25, 0.125, 10.00),
+    "text-embedding-3-small": (0.02, 0.02, 0.0)
+}
+
+
+def usage_counts(response) -> Tuple[int, int, int]:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0, 0
+    input_tokens = getattr(usage, "input_tokens", None)
+    if input_tokens is None:
+        input_tokens = getattr(usage, "prompt_tokens", 0)
+    details = getattr(usage, "input_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    output_tokens = getattr(usage, "output_tokens", 0) or 0
+    return input_tokens or 0, cached_tokens, output_tokens
+
+
+def estimate_cost(model: str, input_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    uncached = max(0, input_tokens - cached_tokens)
+    return (uncached * input_price + cached_tokens * cached_price + output_tokens * output_price) / 1_000_000
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def aggregate_calls(calls: List[dict]) -> dict:
+    latencies = [c["latency_ms"] for c in calls]
+    return {
+        "calls": len(calls),
+        "failed": sum(1 for c in calls if not c["success"]),
+        "retries": sum(c["retries"] for c in calls),
+        "input_tokens": sum(c["input_tokens"] for c in calls),
+        "cached_tokens": sum(c["cached_tokens"] for c in calls),
+        "output_tokens": sum(c["output_tokens"] for c in calls),
+        "cost_usd": round(sum(c["cost_usd"] for c in calls), 6),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1)
+    }
+
+
+class LLMTelemetry:
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex
+        self._calls: List[dict] = []
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+
+    def start_run(self) -> str:
+        with self._lock:
+            self.run_id = uuid.uuid4().hex
+            self._calls = []
+        return self.run_id
+
+    def record(self, stage: str, model: str, started_at: datetime, latency_ms: float, queue_ms: float,
+               retries: int, response=None, error: Optional[Exception] = None) -> dict:
+        input_tokens, cached_tokens, output_tokens = usage_counts(response)
+        call = {
+            "id": uuid.uuid4().hex,
+            "run_id": self.run_id,
+            "stage": stage,
+            "model": model,
+            "started_at": started_at,
+            "latency_ms": latency_ms,
+            "queue_ms": queue_ms,
+            "input_tokens": input_tokens,
+            "cached_tokens": cached_tokens,
+            "output_tokens": output_tokens,
+            "retries": retries,
+            "cost_usd": estimate_cost(model, input_tokens, cached_tokens, output_tokens),
+            "success": error is None,
+            "error": str(error)[:1000] if error is not None else None
+        }
+        with self._lock:
+            self._calls.append(call)
+            self._pending.append(call)
+        return call
+
+    def flush(self, repo) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        try:
+            return len(repo.save_llm_calls(pending))
+        except Exception as e:
+            repo.session.rollback()
+            print(f"Error saving LLM call telemetry: {e}")
+            with self._lock:
+                self._pending = pending + self._pending
+            return 0
+
+    def summary(self) -> dict:
+        with self._lock:
+            calls = list(self._calls)
+        stages: Dict[str, List[dict]] = {}
+        for call in calls:
+            stages.setdefault(call["stage"], []).append(call)
+        return {
+            "run_id": self.run_id,
+            **aggregate_calls(calls),
+            "stages": {stage: aggregate_calls(stage_calls) for stage, stage_calls in stages.items()}
+        }
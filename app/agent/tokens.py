@@ -0,0 +1,60 @@
+import re
+import threading
+from typing import List
+
+from app.config import TOKENIZER_ENCODING
+
+APPROXIMATE_ENCODING = "approximate"
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+class ApproximateEncoding:
+    name = APPROXIMATE_ENCODING
+    pattern = re.compile(r"\s*\S{1,4}|\s+$")
+
+    def encode(self, text: str, disallowed_special=()) -> List[str]:
+        return self.pattern.findall(text)
+
+    def decode(self, tokens: List[str]) -> str:
+        return "".join(tokens)
+
+
+def _load_encoding():
+    if TOKENIZER_ENCODING == APPROXIMATE_ENCODING:
+        return ApproximateEncoding()
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception as e:
+        print(f"Could not load {TOKENIZER_ENCODING} encoding, using approximate token counts: {e}")
+        return ApproximateEncoding()
+
+
+def get_encoding():
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                _encoding = _load_encoding()
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    return len(get_encoding().encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    tokens = get_encoding().encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return get_encoding().decode(tokens[:max_tokens])
+
+
+def split_tokens(text: str, chunk_tokens: int, overlap: int = 0) -> List[str]:
+    encoding = get_encoding()
+    tokens = encoding.encode(text, disallowed_special=())
+    step = max(1, chunk_tokens - overlap)
+    return [encoding.decode(tokens[i:i + chunk_tokens]) for i in range(0, len(tokens), step)
+            if i == 0 or i + overlap < len(tokens)]
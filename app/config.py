@@ -1,5 +1,65 @@
+import os
+
 YOUTUBE_CHANNELS = [
     # "UCn8ujwUInbJkBhffxqAPBVQ", # Dave Ebbelaar
     "UCawZsQWqfGSbCI5yjkdVkTA", # Matthew Berman
 ]
 
+FEED_FETCH_WORKERS = int(os.getenv("FEED_FETCH_WORKERS", "32"))
+FEED_PER_HOST_LIMIT = int(os.getenv("FEED_PER_HOST_LIMIT", "8"))
+FEED_FETCH_TIMEOUT = float(os.getenv("FEED_FETCH_TIMEOUT", "15"))
+
+TRANSCRIPT_WORKERS = int(os.getenv("TRANSCRIPT_WORKERS", "8"))
+TRANSCRIPT_RATE_PER_SECOND = float(os.getenv("TRANSCRIPT_RATE_PER_SECOND", "2"))
+TRANSCRIPT_BURST = float(os.getenv("TRANSCRIPT_BURST", "4"))
+TRANSCRIPT_BATCH_SIZE = int(os.getenv("TRANSCRIPT_BATCH_SIZE", "50"))
+
+ANTHROPIC_MARKDOWN_WORKERS = int(os.getenv("ANTHROPIC_MARKDOWN_WORKERS", "1"))
+ANTHROPIC_MARKDOWN_BATCH_SIZE = int(os.getenv("ANTHROPIC_MARKDOWN_BATCH_SIZE", "20"))
+
+WRITE_FLUSH_INTERVAL = float(os.getenv("WRITE_FLUSH_INTERVAL", "5"))
+
+DIGEST_CONCURRENCY = int(os.getenv("DIGEST_CONCURRENCY", "8"))
+DIGEST_MODE = os.getenv("DIGEST_MODE", "realtime")
+DIGEST_BATCH_MAX_REQUESTS = int(os.getenv("DIGEST_BATCH_MAX_REQUESTS", "50000"))
+
+LLM_CACHE_TTL_HOURS = int(os.getenv("LLM_CACHE_TTL_HOURS", str(24 * 30)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "o200k_base")
+DIGEST_SINGLE_CALL_TOKENS = int(os.getenv("DIGEST_SINGLE_CALL_TOKENS", "6000"))
+DIGEST_CHUNK_TOKENS = int(os.getenv("DIGEST_CHUNK_TOKENS", "4000"))
+DIGEST_CHUNK_OVERLAP = int(os.getenv("DIGEST_CHUNK_OVERLAP", "200"))
+DIGEST_MAX_CHUNKS = int(os.getenv("DIGEST_MAX_CHUNKS", "12"))
+
+CURATOR_BATCH_SIZE = int(os.getenv("CURATOR_BATCH_SIZE", "25"))
+CURATOR_CONCURRENCY = int(os.getenv("CURATOR_CONCURRENCY", "4"))
+CURATOR_RERANK_TOP = int(os.getenv("CURATOR_RERANK_TOP", "0"))
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+CURATOR_PREFILTER_TOP_K = int(os.getenv("CURATOR_PREFILTER_TOP_K", "50"))
+PROFILE_CONCURRENCY = int(os.getenv("PROFILE_CONCURRENCY", "4"))
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.5"))
+DEDUP_WINDOW_HOURS = int(os.getenv("DEDUP_WINDOW_HOURS", str(24 * 7)))
+
+LLM_RPM = int(os.getenv("LLM_RPM", "500"))
+LLM_TPM = int(os.getenv("LLM_TPM", "200000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+LLM_OUTPUT_TOKEN_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKEN_ESTIMATE", "600"))
+LLM_RUN_TOKEN_BUDGET = int(os.getenv("LLM_RUN_TOKEN_BUDGET", "0"))
+LLM_BUDGET_RESERVE = int(os.getenv("LLM_BUDGET_RESERVE", "50000"))
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_SECURITY = os.getenv("SMTP_SECURITY", "ssl").lower()
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "3"))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+SMTP_RATE_PER_SECOND = float(os.getenv("SMTP_RATE_PER_SECOND", "5"))
+SMTP_BURST = float(os.getenv("SMTP_BURST", "10"))
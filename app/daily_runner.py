@@ -1,14 +1,21 @@
 import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Iterator, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from app.agent.llm import get_scheduler
+from app.database.repository import Repository
 from app.runner import run_scrapers
+from app.scrapers.fetch import FeedFetcher
 from app.services.process_anthropic import process_anthropic_markdown
 from app.services.process_youtube import process_youtube_transcripts
 from app.services.process_digest import process_digests
-from app.services.process_email import send_digest_email
+from app.services.process_profiles import send_profile_digests
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,8 +25,24 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def run_daily_pipeline(hours: int = 24, top_n: int = 10) -> dict:
+@contextmanager
+def _timed_stage(results: dict, stage: str) -> Iterator[None]:
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        results["timings"][stage] = round(time.perf_counter() - start, 3)
+        if tracemalloc.is_tracing():
+            results.setdefault("memory_peak_mb", {})[stage] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+
+
+def run_daily_pipeline(hours: int = 24, top_n: int = 10, fetcher: Optional[FeedFetcher] = None,
+                       transcript_api=None, converter=None, email_sender=None) -> dict:
     start_time = datetime.now()
+    llm = get_scheduler()
+    llm.start_run()
     logger.info("=" * 60)
     logger.info("Starting Daily AI News Aggregator Pipeline")
     logger.info("=" * 60)
@@ -30,45 +53,55 @@ def run_daily_pipeline(hours: int = 24, top_n: int = 10) -> dict:
         "processing": {},
         "digests": {},
         "email": {},
+        "timings": {},
         "success": False
     }
     
     try:
         logger.info("\n[1/5] Scraping articles from sources...")
-        scraping_results = run_scrapers(hours=hours)
+        with _timed_stage(results, "scraping"):
+            scraping_results = run_scrapers(hours=hours, fetcher=fetcher)
         results["scraping"] = {
             "youtube": len(scraping_results.get("youtube", [])),
             "openai": len(scraping_results.get("openai", [])),
-            "anthropic": len(scraping_results.get("anthropic", []))
+            "anthropic": len(scraping_results.get("anthropic", [])),
+            "unchanged_feeds": scraping_results.get("unchanged_feeds", 0)
         }
         logger.info(f"✓ Scraped {results['scraping']['youtube']} YouTube videos, "
                     f"{results['scraping']['openai']} OpenAI articles, "
-                    f"{results['scraping']['anthropic']} Anthropic articles")
+                    f"{results['scraping']['anthropic']} Anthropic articles "
+                    f"({results['scraping']['unchanged_feeds']} feeds unchanged)")
         
         logger.info("\n[2/5] Processing Anthropic markdown...")
-        anthropic_result = process_anthropic_markdown()
+        with _timed_stage(results, "anthropic"):
+            anthropic_result = process_anthropic_markdown(converter=converter)
         results["processing"]["anthropic"] = anthropic_result
         logger.info(f"✓ Processed {anthropic_result['processed']} Anthropic articles "
                     f"({anthropic_result['failed']} failed)")
         
         logger.info("\n[3/5] Processing YouTube transcripts...")
-        youtube_result = process_youtube_transcripts()
+        with _timed_stage(results, "youtube"):
+            youtube_result = process_youtube_transcripts(transcript_api=transcript_api)
         results["processing"]["youtube"] = youtube_result
         logger.info(f"✓ Processed {youtube_result['processed']} transcripts "
                     f"({youtube_result['unavailable']} unavailable)")
         
         logger.info("\n[4/5] Creating digests for articles...")
-        digest_result = process_digests()
+        with _timed_stage(results, "digests"):
+            digest_result = process_digests()
         results["digests"] = digest_result
         logger.info(f"✓ Created {digest_result['processed']} digests "
-                    f"({digest_result['failed']} failed out of {digest_result['total']} total)")
+                    f"({digest_result['failed']} failed, {digest_result.get('skipped', 0)} skipped "
+                    f"out of {digest_result['total']} total)")
         
-        logger.info("\n[5/5] Generating and sending email digest...")
-        email_result = send_digest_email(hours=hours, top_n=top_n)
+        logger.info("\n[5/5] Ranking and sending email digests per profile...")
+        with _timed_stage(results, "email"):
+            email_result = send_profile_digests(hours=hours, top_n=top_n, sender=email_sender)
         results["email"] = email_result
         
         if email_result["success"]:
-            logger.info(f"✓ Email sent successfully with {email_result['articles_count']} articles")
+            logger.info(f"✓ Sent {email_result['sent']} of {email_result['profiles']} profile digests "
+                        f"with {email_result['articles_count']} articles")
             results["success"] = True
         else:
             logger.error(f"✗ Failed to send email: {email_result.get('error', 'Unknown error')}")
@@ -81,6 +114,9 @@ def run_daily_pipeline(hours: int = 24, top_n: int = 10) -> dict:
     duration = (end_time - start_time).total_seconds()
     results["end_time"] = end_time.isoformat()
     results["duration_seconds"] = duration
+    with Repository() as repo:
+        llm.telemetry.flush(repo)
+    results["llm"] = {**llm.telemetry.summary(), "budget_tokens": llm.used_tokens}
     
     logger.info("\n" + "=" * 60)
     logger.info("Pipeline Summary")
@@ -89,6 +125,11 @@ def run_daily_pipeline(hours: int = 24, top_n: int = 10) -> dict:
     logger.info(f"Scraped: {results['scraping']}")
     logger.info(f"Processed: {results['processing']}")
     logger.info(f"Digests: {results['digests']}")
+    logger.info(f"Stage timings (s): {results['timings']}")
+    for stage, stats in results["llm"]["stages"].items():
+        logger.info(f"LLM {stage}: {stats['calls']} calls, p50 {stats['p50_ms']:.0f}ms, p95 {stats['p95_ms']:.0f}ms, "
+                    f"{stats['input_tokens']} in ({stats['cached_tokens']} cached) / {stats['output_tokens']} out tokens, "
+                    f"${stats['cost_usd']:.4f}")
     logger.info(f"Email: {'Sent' if results['success'] else 'Failed'}")
     logger.info("=" * 60)
     
@@ -0,0 +1,70 @@
+import time
+from typing import Any, Dict, List
+from sqlalchemy import column, update, values
+from sqlalchemy.orm import Session
+
+
+class BatchUpdater:
+    def __init__(self, session: Session, model, key: str, field: str,
+                 batch_size: int = 100, flush_interval: float = 5.0):
+        self.session = session
+        self.table = model.__table__
+        self.key = key
+        self.field = field
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending: Dict[str, Any] = {}
+        self.written = 0
+        self.failed: List[str] = []
+        self._last_flush = time.monotonic()
+
+    def __enter__(self) -> "BatchUpdater":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
+
+    def add(self, key: str, value: Any) -> None:
+        self.pending[key] = value
+        if len(self.pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _execute(self, rows: List[tuple]) -> None:
+        data = values(
+            column("key", self.table.c[self.key].type),
+            column("value", self.table.c[self.field].type),
+            name="batch"
+        ).data(rows)
+        self.session.execute(
+            update(self.table)
+            .where(self.table.c[self.key] == data.c.key)
+            .values({self.field: data.c.value})
+        )
+        self.session.commit()
+
+    def flush(self) -> int:
+        rows = list(self.pending.items())
+        self.pending = {}
+        self._last_flush = time.monotonic()
+        if not rows:
+            return 0
+        
+        try:
+            self._execute(rows)
+            self.written += len(rows)
+            return len(rows)
+        except Exception as e:
+            self.session.rollback()
+            print(f"Batch update of {self.table.name}.{self.field} failed, retrying row by row: {e}")
+        
+        written = 0
+        for row in rows:
+            try:
+                self._execute([row])
+                written += 1
+            except Exception as e:
+                self.session.rollback()
+                self.failed.append(row[0])
+                print(f"Error updating {self.table.name} {row[0]}: {e}")
+        self.written += written
+        return written
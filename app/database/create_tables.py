@@ -5,8 +5,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from app.database.models import Base
 from app.database.connection import engine
+from app.database.migrations import migrate
 
 if __name__ == "__main__":
     Base.metadata.create_all(engine)
     print("Tables created successfully")
+    versions = migrate(engine)
+    print(f"Applied migrations: {versions}" if versions else "Schema is up to date")
 
@@ -0,0 +1,192 @@
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, Union
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database.types import COMPRESS_MIN_BYTES, compress_text, decompress_text
+
+
+MIGRATION_LOCK_ID = 7_318_204
+
+Step = Union[str, Callable[[Connection], None]]
+
+
+def create_index(name: str, table: str, definition: str, where: str = "") -> Callable[[Connection], None]:
+    def step(conn: Connection) -> None:
+        invalid = conn.execute(text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ), {"name": name}).first()
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        predicate = f" WHERE {where}" if where else ""
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({definition}){predicate}"))
+    return step
+
+
+def _column_type(conn: Connection, table: str, column: str) -> str:
+    return conn.execute(text(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = :table AND column_name = :column"
+    ), {"table": table, "column": column}).scalar()
+
+
+def _swap_columns(conn: Connection, table: str, column: str, staged: str) -> None:
+    conn.execute(text("BEGIN"))
+    try:
+        conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+        conn.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+        conn.execute(text(
+            f"UPDATE {table} SET {staged} = '\\x00'::bytea || convert_to({column}, 'UTF8') "
+            f"WHERE {staged} IS NULL AND {column} IS NOT NULL"
+        ))
+        conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+        conn.execute(text(f"ALTER TABLE {table} RENAME COLUMN {staged} TO {column}"))
+        conn.execute(text("COMMIT"))
+    except Exception:
+        conn.execute(text("ROLLBACK"))
+        raise
+
+
+def compress_column(table: str, key: str, column: str, batch_size: int = 200) -> Callable[[Connection], None]:
+    staged = f"{column}_compressed"
+    
+    def step(conn: Connection) -> None:
+        if _column_type(conn, table, column) != "bytea":
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {staged} BYTEA"))
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {staged} SET STORAGE EXTERNAL"))
+            last_key = ""
+            while True:
+                rows = conn.execute(text(
+                    f"SELECT {key}, {column} FROM {table} "
+                    f"WHERE {key} > :last_key AND {staged} IS NULL AND {column} IS NOT NULL "
+                    f"ORDER BY {key} LIMIT :batch_size"
+                ), {"last_key": last_key, "batch_size": batch_size}).all()
+                if not rows:
+                    break
+                conn.execute(
+                    text(f"UPDATE {table} SET {staged} = :value WHERE {key} = :key"),
+                    [{"value": compress_text(value), "key": row_key} for row_key, value in rows]
+                )
+                last_key = rows[-1][0]
+            _swap_columns(conn, table, column, staged)
+        conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET STORAGE EXTERNAL"))
+        
+        last_key = ""
+        while True:
+            rows = conn.execute(text(
+                f"SELECT {key}, {column} FROM {table} "
+                f"WHERE {key} > :last_key AND get_byte({column}, 0) = 0 AND length({column}) > :min_bytes "
+                f"ORDER BY {key} LIMIT :batch_size"
+            ), {"last_key": last_key, "min_bytes": COMPRESS_MIN_BYTES, "batch_size": batch_size}).all()
+            if not rows:
+                return
+            conn.execute(
+                text(f"UPDATE {table} SET {column} = :value WHERE {key} = :key"),
+                [{"value": compress_text(decompress_text(value)), "key": row_key} for row_key, value in rows]
+            )
+            last_key = rows[-1][0]
+    return step
+
+
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, "hot_path_indexes", [
+        create_index("ix_digests_created_at", "digests", "created_at DESC"),
+        create_index("ix_digests_article", "digests", "article_type, article_id"),
+        create_index("ix_youtube_videos_pending_transcript", "youtube_videos", "video_id", "transcript IS NULL"),
+        create_index("ix_anthropic_articles_pending_markdown", "anthropic_articles", "guid", "markdown IS NULL"),
+    ]),
+    (2, "compressed_bodies", [
+        compress_column("youtube_videos", "video_id", "transcript"),
+        compress_column("anthropic_articles", "guid", "markdown"),
+        create_index("ix_youtube_videos_pending_transcript", "youtube_videos", "video_id", "transcript IS NULL"),
+        create_index("ix_anthropic_articles_pending_markdown", "anthropic_articles", "guid", "markdown IS NULL"),
+    ]),
+    (3, "digest_duplicates", [
+        "ALTER TABLE digests ADD COLUMN IF NOT EXISTS duplicate_of VARCHAR",
+    ]),
+]
+
+HOT_QUERIES: Dict[str, Tuple[str, str]] = {
+    "recent_digests": (
+        "SELECT * FROM digests WHERE created_at >= now() - interval '24 hours' ORDER BY created_at DESC",
+        "ix_digests_created_at",
+    ),
+    "digest_lookup": (
+        "SELECT 1 FROM digests WHERE article_type = 'youtube' AND article_id = 'x'",
+        "ix_digests_article",
+    ),
+    "videos_without_transcript": (
+        "SELECT * FROM youtube_videos WHERE transcript IS NULL",
+        "ix_youtube_videos_pending_transcript",
+    ),
+    "articles_without_markdown": (
+        "SELECT * FROM anthropic_articles WHERE markdown IS NULL",
+        "ix_anthropic_articles_pending_markdown",
+    ),
+}
+
+
+def _ensure_version_table(conn: Connection) -> None:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def get_applied_versions(engine: Engine) -> List[int]:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        _ensure_version_table(conn)
+        return [row[0] for row in conn.execute(text("SELECT version FROM schema_migrations ORDER BY version"))]
+
+
+def migrate(engine: Engine) -> List[int]:
+    applied = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SET statement_timeout = 0"))
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            _ensure_version_table(conn)
+            done = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+            for version, name, steps in sorted(MIGRATIONS, key=lambda m: m[0]):
+                if version in done:
+                    continue
+                for step in steps:
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(text(step))
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+                    {"version": version, "name": name, "applied_at": datetime.now(timezone.utc)}
+                )
+                applied.append(version)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+    return applied
+
+
+def check_hot_query_plans(engine: Engine) -> Dict[str, bool]:
+    results = {}
+    with engine.connect() as conn:
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, (query, index_name) in HOT_QUERIES.items():
+            plan = "\n".join(row[0] for row in conn.execute(text(f"EXPLAIN {query}")))
+            results[name] = index_name in plan
+        conn.rollback()
+    return results
+
+
+if __name__ == "__main__":
+    from app.database.connection import engine
+    
+    if "--explain" in sys.argv:
+        for name, uses_index in check_hot_query_plans(engine).items():
+            print(f"{name}: {'index' if uses_index else 'SEQ SCAN'}")
+    else:
+        versions = migrate(engine)
+        print(f"Applied migrations: {versions}" if versions else "Schema is up to date")
@@ -1,11 +1,16 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
-from sqlalchemy import Column, String, DateTime, Text
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, String, DateTime, Text, Index, Integer, LargeBinary, Float, Boolean, JSON, text
+from sqlalchemy.orm import declarative_base, deferred
+from .types import CompressedText
 
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class YouTubeVideo(Base):
     __tablename__ = "youtube_videos"
     
@@ -15,8 +20,12 @@ class YouTubeVideo(Base):
     channel_id = Column(String, nullable=False)
     published_at = Column(DateTime, nullable=False)
     description = Column(Text)
-    transcript = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    transcript = deferred(Column(CompressedText, nullable=True))
+    created_at = Column(DateTime, default=utcnow)
+    
+    __table_args__ = (
+        Index("ix_youtube_videos_pending_transcript", video_id, postgresql_where=text("transcript IS NULL")),
+    )
 
 
 class OpenAIArticle(Base):
@@ -28,7 +37,7 @@ class OpenAIArticle(Base):
     description = Column(Text)
     published_at = Column(DateTime, nullable=False)
     category = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow)
 
 
 class AnthropicArticle(Base):
@@ -40,8 +49,12 @@ class AnthropicArticle(Base):
     description = Column(Text)
     published_at = Column(DateTime, nullable=False)
     category = Column(String, nullable=True)
-    markdown = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    markdown = deferred(Column(CompressedText, nullable=True))
+    created_at = Column(DateTime, default=utcnow)
+    
+    __table_args__ = (
+        Index("ix_anthropic_articles_pending_markdown", guid, postgresql_where=text("markdown IS NULL")),
+    )
 
 
 class Digest(Base):
@@ -53,5 +66,120 @@ class Digest(Base):
     url = Column(String, nullable=False)
     title = Column(String, nullable=False)
     summary = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    duplicate_of = Column(String, nullable=True)
+    created_at = Column(DateTime, default=utcnow)
+    
+    __table_args__ = (
+        Index("ix_digests_created_at", created_at.desc()),
+        Index("ix_digests_article", article_type, article_id),
+    )
+
+
+
+class FeedState(Base):
+    __tablename__ = "feed_states"
+    
+    url = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)
+    checked_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow)
+
+
+class DigestBatch(Base):
+    __tablename__ = "digest_batches"
+    
+    id = Column(String, primary_key=True)
+    status = Column(String, nullable=False)
+    input_file_id = Column(String, nullable=False)
+    output_file_id = Column(String, nullable=True)
+    error_file_id = Column(String, nullable=True)
+    request_count = Column(Integer, nullable=False)
+    ingested_count = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+    
+    key = Column(String, primary_key=True)
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    content_hash = Column(String, nullable=False)
+    response = Column(Text, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=utcnow)
+    last_used_at = Column(DateTime, default=utcnow)
+    
+    __table_args__ = (
+        Index("ix_llm_cache_last_used_at", last_used_at),
+    )
+
 
+class DigestEmbedding(Base):
+    __tablename__ = "digest_embeddings"
+    
+    digest_id = Column(String, primary_key=True)
+    model = Column(String, primary_key=True)
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=utcnow)
+
+
+class ContentSignature(Base):
+    __tablename__ = "content_signatures"
+    
+    digest_id = Column(String, primary_key=True)
+    signature = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=utcnow)
+    
+    __table_args__ = (
+        Index("ix_content_signatures_created_at", created_at),
+    )
+
+
+class LLMCall(Base):
+    __tablename__ = "llm_calls"
+    
+    id = Column(String, primary_key=True)
+    run_id = Column(String, nullable=False)
+    stage = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    latency_ms = Column(Float, nullable=False)
+    queue_ms = Column(Float, nullable=False, default=0.0)
+    input_tokens = Column(Integer, nullable=False, default=0)
+    cached_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    retries = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+    success = Column(Boolean, nullable=False, default=True)
+    error = Column(Text)
+    
+    __table_args__ = (
+        Index("ix_llm_calls_started_at", started_at),
+        Index("ix_llm_calls_run_stage", run_id, stage),
+    )
+
+
+class CuratorScore(Base):
+    __tablename__ = "curator_scores"
+    
+    profile_version = Column(String, primary_key=True)
+    digest_id = Column(String, primary_key=True)
+    relevance_score = Column(Float, nullable=False)
+    reasoning = Column(Text)
+    model = Column(String, nullable=False)
+    created_at = Column(DateTime, default=utcnow)
+
+
+class Profile(Base):
+    __tablename__ = "profiles"
+    
+    id = Column(String, primary_key=True)
+    name = Column(String, nullable=False)
+    email = Column(String, nullable=True)
+    data = Column(JSON, nullable=False)
+    active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=utcnow)
@@ -1,20 +1,76 @@
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+from sqlalchemy import delete, exists, literal, or_, select, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from .models import YouTubeVideo, OpenAIArticle, AnthropicArticle, Digest
+from .models import YouTubeVideo, OpenAIArticle, AnthropicArticle, Digest, FeedState, DigestBatch, LLMCacheEntry, DigestEmbedding, ContentSignature, LLMCall, CuratorScore, Profile
 from .connection import get_session
+from .batch import BatchUpdater
+
+
+BULK_INSERT_CHUNK_SIZE = 1000
+STREAM_PAGE_SIZE = 500
 
 
 class Repository:
     def __init__(self, session: Optional[Session] = None):
+        self._owns_session = session is None
         self.session = session or get_session()
     
+    def __enter__(self) -> "Repository":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.session.rollback()
+        self.close()
+    
+    def close(self) -> None:
+        if self._owns_session:
+            self.session.close()
+    
+    def _insert_ignore(self, model, rows: List[dict], key: str, conflict_columns: Optional[List[str]] = None) -> List[str]:
+        rows = list({row[key]: row for row in rows}.values())
+        new_keys = []
+        for i in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            stmt = (
+                insert(model)
+                .values(rows[i:i + BULK_INSERT_CHUNK_SIZE])
+                .on_conflict_do_nothing(index_elements=conflict_columns or [key])
+                .returning(getattr(model, key))
+            )
+            new_keys.extend(self.session.execute(stmt).scalars())
+        if rows:
+            self.session.commit()
+        return new_keys
+    
+    def _insert_one(self, model, values: dict):
+        stmt = insert(model).values(**values).on_conflict_do_nothing().returning(model)
+        created = self.session.scalars(stmt).first()
+        self.session.commit()
+        return created
+    
+    def _iter_pending(self, model, key_column, condition, limit: Optional[int], page_size: int) -> Iterator:
+        last_key = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            query = self.session.query(model).filter(condition)
+            if last_key is not None:
+                query = query.filter(key_column > last_key)
+            size = page_size if remaining is None else min(page_size, remaining)
+            page = query.order_by(key_column).limit(size).all()
+            if not page:
+                return
+            for row in page:
+                self.session.expunge(row)
+                yield row
+            last_key = getattr(page[-1], key_column.key)
+            if remaining is not None:
+                remaining -= len(page)
+    
     def create_youtube_video(self, video_id: str, title: str, url: str, channel_id: str, 
                             published_at: datetime, description: str = "", transcript: Optional[str] = None) -> Optional[YouTubeVideo]:
-        existing = self.session.query(YouTubeVideo).filter_by(video_id=video_id).first()
-        if existing:
-            return None
-        video = YouTubeVideo(
+        return self._insert_one(YouTubeVideo, dict(
             video_id=video_id,
             title=title,
             url=url,
@@ -22,99 +78,69 @@ class Repository:
             published_at=published_at,
             description=description,
             transcript=transcript
-        )
-        self.session.add(video)
-        self.session.commit()
-        return video
+        ))
     
     def create_openai_article(self, guid: str, title: str, url: str, published_at: datetime,
                               description: str = "", category: Optional[str] = None) -> Optional[OpenAIArticle]:
-        existing = self.session.query(OpenAIArticle).filter_by(guid=guid).first()
-        if existing:
-            return None
-        article = OpenAIArticle(
+        return self._insert_one(OpenAIArticle, dict(
             guid=guid,
             title=title,
             url=url,
             published_at=published_at,
             description=description,
             category=category
-        )
-        self.session.add(article)
-        self.session.commit()
-        return article
+        ))
     
     def create_anthropic_article(self, guid: str, title: str, url: str, published_at: datetime,
                                 description: str = "", category: Optional[str] = None) -> Optional[AnthropicArticle]:
-        existing = self.session.query(AnthropicArticle).filter_by(guid=guid).first()
-        if existing:
-            return None
-        article = AnthropicArticle(
+        return self._insert_one(AnthropicArticle, dict(
             guid=guid,
             title=title,
             url=url,
             published_at=published_at,
             description=description,
             category=category
-        )
-        self.session.add(article)
-        self.session.commit()
-        return article
-    
-    def bulk_create_youtube_videos(self, videos: List[dict]) -> int:
-        new_videos = []
-        for v in videos:
-            existing = self.session.query(YouTubeVideo).filter_by(video_id=v["video_id"]).first()
-            if not existing:
-                new_videos.append(YouTubeVideo(
-                    video_id=v["video_id"],
-                    title=v["title"],
-                    url=v["url"],
-                    channel_id=v.get("channel_id", ""),
-                    published_at=v["published_at"],
-                    description=v.get("description", ""),
-                    transcript=v.get("transcript")
-                ))
-        if new_videos:
-            self.session.add_all(new_videos)
-            self.session.commit()
-        return len(new_videos)
-    
-    def bulk_create_openai_articles(self, articles: List[dict]) -> int:
-        new_articles = []
-        for a in articles:
-            existing = self.session.query(OpenAIArticle).filter_by(guid=a["guid"]).first()
-            if not existing:
-                new_articles.append(OpenAIArticle(
-                    guid=a["guid"],
-                    title=a["title"],
-                    url=a["url"],
-                    published_at=a["published_at"],
-                    description=a.get("description", ""),
-                    category=a.get("category")
-                ))
-        if new_articles:
-            self.session.add_all(new_articles)
-            self.session.commit()
-        return len(new_articles)
-    
-    def bulk_create_anthropic_articles(self, articles: List[dict]) -> int:
-        new_articles = []
-        for a in articles:
-            existing = self.session.query(AnthropicArticle).filter_by(guid=a["guid"]).first()
-            if not existing:
-                new_articles.append(AnthropicArticle(
-                    guid=a["guid"],
-                    title=a["title"],
-                    url=a["url"],
-                    published_at=a["published_at"],
-                    description=a.get("description", ""),
-                    category=a.get("category")
-                ))
-        if new_articles:
-            self.session.add_all(new_articles)
-            self.session.commit()
-        return len(new_articles)
+        ))
+    
+    def bulk_create_youtube_videos(self, videos: List[dict]) -> List[str]:
+        return self._insert_ignore(YouTubeVideo, [
+            {
+                "video_id": v["video_id"],
+                "title": v["title"],
+                "url": v["url"],
+                "channel_id": v.get("channel_id", ""),
+                "published_at": v["published_at"],
+                "description": v.get("description", ""),
+                "transcript": v.get("transcript")
+            }
+            for v in videos
+        ], "video_id")
+    
+    def bulk_create_openai_articles(self, articles: List[dict]) -> List[str]:
+        return self._insert_ignore(OpenAIArticle, [
+            {
+                "guid": a["guid"],
+                "title": a["title"],
+                "url": a["url"],
+                "published_at": a["published_at"],
+                "description": a.get("description", ""),
+                "category": a.get("category")
+            }
+            for a in articles
+        ], "guid")
+    
+    def bulk_create_anthropic_articles(self, articles: List[dict]) -> List[str]:
+        return self._insert_ignore(AnthropicArticle, [
+            {
+                "guid": a["guid"],
+                "title": a["title"],
+                "url": a["url"],
+                "published_at": a["published_at"],
+                "description": a.get("description", ""),
+                "category": a.get("category")
+            }
+            for a in articles
+        ], "guid")
     
     def get_anthropic_articles_without_markdown(self, limit: Optional[int] = None) -> List[AnthropicArticle]:
         query = self.session.query(AnthropicArticle).filter(AnthropicArticle.markdown.is_(None))
@@ -122,13 +148,26 @@ class Repository:
             query = query.limit(limit)
         return query.all()
     
+    def iter_anthropic_articles_without_markdown(self, limit: Optional[int] = None,
+                                                 page_size: int = STREAM_PAGE_SIZE) -> Iterator[AnthropicArticle]:
+        return self._iter_pending(AnthropicArticle, AnthropicArticle.guid, AnthropicArticle.markdown.is_(None),
+                                  limit, page_size)
+    
     def update_anthropic_article_markdown(self, guid: str, markdown: str) -> bool:
-        article = self.session.query(AnthropicArticle).filter_by(guid=guid).first()
-        if article:
-            article.markdown = markdown
-            self.session.commit()
-            return True
-        return False
+        result = self.session.execute(
+            update(AnthropicArticle).where(AnthropicArticle.guid == guid).values(markdown=markdown)
+        )
+        self.session.commit()
+        return result.rowcount > 0
+    
+    def markdown_writer(self, batch_size: int = 100, flush_interval: float = 5.0) -> BatchUpdater:
+        return BatchUpdater(self.session, AnthropicArticle, "guid", "markdown", batch_size, flush_interval)
+    
+    def bulk_update_anthropic_article_markdown(self, markdowns: Dict[str, str]) -> int:
+        writer = self.markdown_writer(batch_size=len(markdowns) + 1)
+        for guid, markdown in markdowns.items():
+            writer.add(guid, markdown)
+        return writer.flush()
     
     def get_youtube_videos_without_transcript(self, limit: Optional[int] = None) -> List[YouTubeVideo]:
         query = self.session.query(YouTubeVideo).filter(YouTubeVideo.transcript.is_(None))
@@ -136,77 +175,123 @@ class Repository:
             query = query.limit(limit)
         return query.all()
     
+    def iter_youtube_videos_without_transcript(self, limit: Optional[int] = None,
+                                               page_size: int = STREAM_PAGE_SIZE) -> Iterator[YouTubeVideo]:
+        return self._iter_pending(YouTubeVideo, YouTubeVideo.video_id, YouTubeVideo.transcript.is_(None),
+                                  limit, page_size)
+    
     def update_youtube_video_transcript(self, video_id: str, transcript: str) -> bool:
-        video = self.session.query(YouTubeVideo).filter_by(video_id=video_id).first()
-        if video:
-            video.transcript = transcript
-            self.session.commit()
-            return True
-        return False
+        result = self.session.execute(
+            update(YouTubeVideo).where(YouTubeVideo.video_id == video_id).values(transcript=transcript)
+        )
+        self.session.commit()
+        return result.rowcount > 0
     
-    def get_articles_without_digest(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        articles = []
-        seen_ids = set()
-        
-        digests = self.session.query(Digest).all()
-        for d in digests:
-            seen_ids.add(f"{d.article_type}:{d.article_id}")
-        
-        youtube_videos = self.session.query(YouTubeVideo).filter(
-            YouTubeVideo.transcript.isnot(None),
-            YouTubeVideo.transcript != "__UNAVAILABLE__"
-        ).all()
-        for video in youtube_videos:
-            key = f"youtube:{video.video_id}"
-            if key not in seen_ids:
-                articles.append({
-                    "type": "youtube",
-                    "id": video.video_id,
-                    "title": video.title,
-                    "url": video.url,
-                    "content": video.transcript or video.description or "",
-                    "published_at": video.published_at
-                })
-        
-        openai_articles = self.session.query(OpenAIArticle).all()
-        for article in openai_articles:
-            key = f"openai:{article.guid}"
-            if key not in seen_ids:
-                articles.append({
-                    "type": "openai",
-                    "id": article.guid,
-                    "title": article.title,
-                    "url": article.url,
-                    "content": article.description or "",
-                    "published_at": article.published_at
-                })
-        
-        anthropic_articles = self.session.query(AnthropicArticle).filter(
-            AnthropicArticle.markdown.isnot(None)
-        ).all()
-        for article in anthropic_articles:
-            key = f"anthropic:{article.guid}"
-            if key not in seen_ids:
-                articles.append({
-                    "type": "anthropic",
-                    "id": article.guid,
-                    "title": article.title,
-                    "url": article.url,
-                    "content": article.markdown or article.description or "",
-                    "published_at": article.published_at
-                })
+    def transcript_writer(self, batch_size: int = 100, flush_interval: float = 5.0) -> BatchUpdater:
+        return BatchUpdater(self.session, YouTubeVideo, "video_id", "transcript", batch_size, flush_interval)
+    
+    def bulk_update_youtube_video_transcripts(self, transcripts: Dict[str, str]) -> int:
+        writer = self.transcript_writer(batch_size=len(transcripts) + 1)
+        for video_id, transcript in transcripts.items():
+            writer.add(video_id, transcript)
+        return writer.flush()
+    
+    def _digest_sources(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            "youtube": {
+                "model": YouTubeVideo,
+                "key": YouTubeVideo.video_id,
+                "filters": [YouTubeVideo.transcript.isnot(None), YouTubeVideo.transcript != "__UNAVAILABLE__"],
+                "content": [YouTubeVideo.transcript, YouTubeVideo.description],
+            },
+            "openai": {
+                "model": OpenAIArticle,
+                "key": OpenAIArticle.guid,
+                "filters": [],
+                "content": [OpenAIArticle.description],
+            },
+            "anthropic": {
+                "model": AnthropicArticle,
+                "key": AnthropicArticle.guid,
+                "filters": [AnthropicArticle.markdown.isnot(None)],
+                "content": [AnthropicArticle.markdown, AnthropicArticle.description],
+            },
+        }
+    
+    def _pending_digest_keys(self, limit: Optional[int], after: Optional[tuple] = None) -> List[tuple]:
+        sources = self._digest_sources()
+        pending = union_all(*[
+            select(
+                literal(article_type).label("type"),
+                source["key"].label("id"),
+                source["model"].published_at.label("published_at")
+            )
+            .where(*source["filters"])
+            .where(~exists().where(
+                Digest.article_type == article_type,
+                Digest.article_id == source["key"]
+            ))
+            for article_type, source in sources.items()
+        ]).subquery()
         
+        query = select(pending.c.published_at, pending.c.type, pending.c.id).order_by(
+            pending.c.published_at.desc(), pending.c.type.desc(), pending.c.id.desc()
+        )
+        if after is not None:
+            query = query.where(tuple_(pending.c.published_at, pending.c.type, pending.c.id) < tuple_(*after))
         if limit:
-            articles = articles[:limit]
-        
-        return articles
+            query = query.limit(limit)
+        return [tuple(row) for row in self.session.execute(query)]
     
-    def create_digest(self, article_type: str, article_id: str, url: str, title: str, summary: str, published_at: Optional[datetime] = None) -> Optional[Digest]:
-        digest_id = f"{article_type}:{article_id}"
-        existing = self.session.query(Digest).filter_by(id=digest_id).first()
-        if existing:
-            return None
+    def _load_digest_articles(self, keys: List[tuple], include_content: bool = True) -> List[Dict[str, Any]]:
+        sources = self._digest_sources()
+        ids_by_type: Dict[str, List[str]] = {}
+        for _, article_type, article_id in keys:
+            ids_by_type.setdefault(article_type, []).append(article_id)
         
+        rows = {}
+        for article_type, ids in ids_by_type.items():
+            source = sources[article_type]
+            model = source["model"]
+            content_columns = source["content"] if include_content else []
+            result = self.session.execute(
+                select(source["key"], model.title, model.url, model.published_at, *content_columns)
+                .where(source["key"].in_(ids))
+            )
+            for article_id, title, url, published_at, *content in result:
+                rows[(article_type, article_id)] = {
+                    "type": article_type,
+                    "id": article_id,
+                    "title": title,
+                    "url": url,
+                    "content": next((c for c in content if c), ""),
+                    "published_at": published_at
+                }
+        
+        return [rows[(t, i)] for _, t, i in keys if (t, i) in rows]
+    
+    def get_articles_by_keys(self, keys: List[Tuple[str, str]], include_content: bool = False) -> List[Dict[str, Any]]:
+        return self._load_digest_articles([(None, t, i) for t, i in keys], include_content=include_content)
+    
+    def get_articles_without_digest(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._load_digest_articles(self._pending_digest_keys(limit))
+    
+    def iter_articles_without_digest(self, limit: Optional[int] = None,
+                                     page_size: int = STREAM_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        after = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            keys = self._pending_digest_keys(size, after)
+            if not keys:
+                return
+            yield from self._load_digest_articles(keys)
+            after = keys[-1]
+            if remaining is not None:
+                remaining -= len(keys)
+    
+    def create_digest(self, article_type: str, article_id: str, url: str, title: str, summary: str, published_at: Optional[datetime] = None,
+                      duplicate_of: Optional[str] = None) -> Optional[Digest]:
         if published_at:
             if published_at.tzinfo is None:
                 published_at = published_at.replace(tzinfo=timezone.utc)
@@ -214,35 +299,250 @@ class Repository:
         else:
             created_at = datetime.now(timezone.utc)
         
-        digest = Digest(
-            id=digest_id,
+        return self._insert_one(Digest, dict(
+            id=f"{article_type}:{article_id}",
             article_type=article_type,
             article_id=article_id,
             url=url,
             title=title,
             summary=summary,
+            duplicate_of=duplicate_of,
             created_at=created_at
+        ))
+    
+    def get_digests_by_ids(self, digest_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not digest_ids:
+            return {}
+        rows = self.session.execute(
+            select(Digest.id, Digest.title, Digest.summary, Digest.url).where(Digest.id.in_(digest_ids))
         )
-        self.session.add(digest)
+        return {row.id: dict(row._mapping) for row in rows}
+    
+    def get_recent_signatures(self, hours: int) -> Dict[str, bytes]:
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+        rows = self.session.execute(
+            select(ContentSignature.digest_id, ContentSignature.signature)
+            .join(Digest, Digest.id == ContentSignature.digest_id)
+            .where(ContentSignature.created_at >= cutoff_time, Digest.duplicate_of.is_(None))
+        )
+        return {digest_id: signature for digest_id, signature in rows}
+    
+    def save_signatures(self, signatures: Dict[str, bytes]) -> List[str]:
+        return self._insert_ignore(ContentSignature, [
+            {"digest_id": digest_id, "signature": signature}
+            for digest_id, signature in signatures.items()
+        ], "digest_id")
+    
+    def create_digest_batch(self, batch_id: str, status: str, input_file_id: str, request_count: int) -> DigestBatch:
+        batch = DigestBatch(
+            id=batch_id,
+            status=status,
+            input_file_id=input_file_id,
+            request_count=request_count
+        )
+        self.session.add(batch)
         self.session.commit()
-        return digest
+        return batch
+    
+    def get_pending_digest_batches(self) -> List[DigestBatch]:
+        return self.session.query(DigestBatch).filter(DigestBatch.completed_at.is_(None)).all()
     
-    def get_recent_digests(self, hours: int = 24) -> List[Dict[str, Any]]:
+    def update_digest_batch(self, batch_id: str, **fields) -> bool:
+        result = self.session.execute(update(DigestBatch).where(DigestBatch.id == batch_id).values(**fields))
+        self.session.commit()
+        return result.rowcount > 0
+    
+    def get_recent_digests(self, hours: int = 24, include_duplicates: bool = False) -> List[Dict[str, Any]]:
+        return list(self.iter_recent_digests(hours=hours, include_duplicates=include_duplicates))
+    
+    def iter_recent_digests(self, hours: int = 24, page_size: int = STREAM_PAGE_SIZE,
+                            include_duplicates: bool = False) -> Iterator[Dict[str, Any]]:
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
-        digests = self.session.query(Digest).filter(
-            Digest.created_at >= cutoff_time
-        ).order_by(Digest.created_at.desc()).all()
-        
-        return [
+        columns = (Digest.id, Digest.article_type, Digest.article_id, Digest.url,
+                   Digest.title, Digest.summary, Digest.created_at)
+        after: Optional[Tuple[datetime, str]] = None
+        while True:
+            query = select(*columns).where(Digest.created_at >= cutoff_time)
+            if not include_duplicates:
+                query = query.where(Digest.duplicate_of.is_(None))
+            if after is not None:
+                query = query.where(tuple_(Digest.created_at, Digest.id) < tuple_(*after))
+            query = query.order_by(Digest.created_at.desc(), Digest.id.desc()).limit(page_size)
+            page = self.session.execute(query).all()
+            if not page:
+                return
+            for row in page:
+                yield dict(row._mapping)
+            after = (page[-1].created_at, page[-1].id)
+    
+    def get_feed_states(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not urls:
+            return {}
+        states = self.session.query(FeedState).filter(FeedState.url.in_(urls)).all()
+        return {
+            s.url: {
+                "etag": s.etag,
+                "last_modified": s.last_modified,
+                "content_hash": s.content_hash
+            }
+            for s in states
+        }
+    
+    def save_feed_states(self, states: List[dict]) -> int:
+        if not states:
+            return 0
+        now = datetime.now(timezone.utc)
+        stmt = insert(FeedState).values([
             {
-                "id": d.id,
-                "article_type": d.article_type,
-                "article_id": d.article_id,
-                "url": d.url,
-                "title": d.title,
-                "summary": d.summary,
-                "created_at": d.created_at
+                "url": s["url"],
+                "etag": s.get("etag"),
+                "last_modified": s.get("last_modified"),
+                "content_hash": s.get("content_hash"),
+                "checked_at": now,
+                "updated_at": now
+            }
+            for s in states
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FeedState.url],
+            set_={
+                "etag": stmt.excluded.etag,
+                "last_modified": stmt.excluded.last_modified,
+                "content_hash": stmt.excluded.content_hash,
+                "checked_at": stmt.excluded.checked_at,
+                "updated_at": stmt.excluded.updated_at
             }
-            for d in digests
+        )
+        self.session.execute(stmt)
+        self.session.commit()
+        return len(states)
+    
+    def get_llm_cache_entry(self, key: str, ttl_hours: int) -> Optional[str]:
+        now = datetime.now(timezone.utc)
+        response = self.session.execute(
+            select(LLMCacheEntry.response)
+            .where(LLMCacheEntry.key == key, LLMCacheEntry.created_at >= now - timedelta(hours=ttl_hours))
+        ).scalar()
+        if response is None:
+            return None
+        self.session.execute(
+            update(LLMCacheEntry)
+            .where(LLMCacheEntry.key == key)
+            .values(hits=LLMCacheEntry.hits + 1, last_used_at=now)
+        )
+        self.session.commit()
+        return response
+    
+    def put_llm_cache_entry(self, key: str, model: str, prompt_version: str, content_hash: str, response: str) -> None:
+        now = datetime.now(timezone.utc)
+        stmt = insert(LLMCacheEntry).values(
+            key=key,
+            model=model,
+            prompt_version=prompt_version,
+            content_hash=content_hash,
+            response=response,
+            hits=0,
+            created_at=now,
+            last_used_at=now
+        )
+        self.session.execute(stmt.on_conflict_do_update(
+            index_elements=[LLMCacheEntry.key],
+            set_={"response": stmt.excluded.response, "created_at": now, "last_used_at": now}
+        ))
+        self.session.commit()
+    
+    def evict_llm_cache(self, ttl_hours: int, max_entries: int) -> int:
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=ttl_hours)
+        expired = self.session.execute(delete(LLMCacheEntry).where(LLMCacheEntry.created_at < cutoff_time)).rowcount
+        overflow = (
+            select(LLMCacheEntry.key)
+            .order_by(LLMCacheEntry.last_used_at.desc())
+            .offset(max_entries)
+            .scalar_subquery()
+        )
+        evicted = self.session.execute(
+            delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(overflow))
+        ).rowcount
+        self.session.commit()
+        return expired + evicted
+    
+    def prune_curator_scores(self, hours: int, profile_versions: List[str]) -> int:
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+        recent = exists().where(Digest.id == CuratorScore.digest_id, Digest.created_at >= cutoff_time)
+        pruned = self.session.execute(
+            delete(CuratorScore).where(or_(CuratorScore.profile_version.not_in(profile_versions), ~recent))
+        ).rowcount
+        self.session.commit()
+        return pruned
+    
+    def get_digest_embeddings(self, digest_ids: List[str], model: str) -> Dict[str, bytes]:
+        if not digest_ids:
+            return {}
+        rows = self.session.execute(
+            select(DigestEmbedding.digest_id, DigestEmbedding.vector)
+            .where(DigestEmbedding.model == model, DigestEmbedding.digest_id.in_(digest_ids))
+        )
+        return {digest_id: vector for digest_id, vector in rows}
+    
+    def save_digest_embeddings(self, model: str, vectors: Dict[str, bytes]) -> List[str]:
+        return self._insert_ignore(DigestEmbedding, [
+            {"digest_id": digest_id, "model": model, "vector": vector}
+            for digest_id, vector in vectors.items()
+        ], "digest_id", conflict_columns=["digest_id", "model"])
+    
+    def get_curator_scores(self, digest_ids: List[str], profile_version: str) -> Dict[str, Tuple[float, Optional[str]]]:
+        if not digest_ids:
+            return {}
+        rows = self.session.execute(
+            select(CuratorScore.digest_id, CuratorScore.relevance_score, CuratorScore.reasoning)
+            .where(CuratorScore.profile_version == profile_version, CuratorScore.digest_id.in_(digest_ids))
+        )
+        return {digest_id: (score, reasoning) for digest_id, score, reasoning in rows}
+    
+    def save_curator_scores(self, profile_version: str, model: str, scores: List[dict]) -> List[str]:
+        return self._insert_ignore(CuratorScore, [
+            {"profile_version": profile_version, "model": model, **score}
+            for score in scores
+        ], "digest_id", conflict_columns=["profile_version", "digest_id"])
+    
+    def get_profiles(self, active_only: bool = True, ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        query = select(Profile).order_by(Profile.id)
+        if ids is not None:
+            query = query.where(Profile.id.in_(ids))
+        if active_only:
+            query = query.where(Profile.active.is_(True))
+        return [
+            {**p.data, "id": p.id, "name": p.name, "email": p.email}
+            for p in self.session.scalars(query)
         ]
-
+    
+    def get_profile(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return next(iter(self.get_profiles(active_only=False, ids=[profile_id])), None)
+    
+    def save_profiles(self, profiles: List[dict]) -> List[str]:
+        rows = list({
+            p["id"]: {
+                "id": p["id"],
+                "name": p["name"],
+                "email": p.get("email"),
+                "data": {k: v for k, v in p.items() if k not in ("id", "name", "email")}
+            }
+            for p in profiles
+        }.values())
+        saved = []
+        for i in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            stmt = insert(Profile).values(rows[i:i + BULK_INSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Profile.id],
+                set_={"name": stmt.excluded.name, "email": stmt.excluded.email, "data": stmt.excluded.data}
+            ).returning(Profile.id)
+            saved.extend(self.session.execute(stmt).scalars())
+        if rows:
+            self.session.commit()
+        return saved
+    
+    def save_llm_calls(self, calls: List[dict]) -> List[str]:
+        return self._insert_ignore(LLMCall, calls, "id")
+    
+    def get_llm_calls(self, run_id: str) -> List[LLMCall]:
+        return self.session.scalars(select(LLMCall).where(LLMCall.run_id == run_id).order_by(LLMCall.started_at)).all()
@@ -0,0 +1,39 @@
+import zlib
+from typing import Optional
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+
+RAW = b"\x00"
+ZLIB = b"\x01"
+COMPRESS_MIN_BYTES = 256
+
+
+def compress_text(value: Optional[str]) -> Optional[bytes]:
+    if value is None:
+        return None
+    data = value.encode("utf-8")
+    if len(data) < COMPRESS_MIN_BYTES:
+        return RAW + data
+    return ZLIB + zlib.compress(data, 6)
+
+
+def decompress_text(value: Optional[bytes]) -> Optional[str]:
+    if value is None:
+        return None
+    value = bytes(value)
+    header, data = value[:1], value[1:]
+    if header == ZLIB:
+        return zlib.decompress(data).decode("utf-8")
+    return data.decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
@@ -0,0 +1,123 @@
+import hashlib
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+from app.config import DEDUP_THRESHOLD, DEDUP_WINDOW_HOURS
+from app.database.repository import Repository
+
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MAX_WORDS = 1000
+_PRIME = np.uint64(4294967311)
+_rng = np.random.default_rng(20240521)
+_A = _rng.integers(1, 2 ** 32, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text: str) -> List[str]:
+    words = re.findall(r"[a-z0-9]+", text.lower())[:MAX_WORDS]
+    if len(words) < SHINGLE_SIZE:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+
+def minhash(text: str) -> np.ndarray:
+    values = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+         for s in set(shingles(text))),
+        dtype=np.uint64
+    )
+    if values.size == 0:
+        return np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+    hashed = (np.outer(values, _A) + _B) % _PRIME
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def article_signature(article: dict) -> np.ndarray:
+    return minhash(f"{article['title']}\n{article['content']}")
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+
+class DedupIndex:
+    def __init__(self, threshold: float = DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.representatives: Dict[str, str] = {}
+        self.buckets: Dict[Tuple[int, bytes], List[str]] = {}
+
+    def _bands(self, signature: np.ndarray) -> Iterator[Tuple[int, bytes]]:
+        for band in range(BANDS):
+            yield band, signature[band * ROWS:(band + 1) * ROWS].tobytes()
+
+    def add(self, key: str, signature: np.ndarray, representative: Optional[str] = None) -> None:
+        self.signatures[key] = signature
+        self.representatives[key] = representative or key
+        for band in self._bands(signature):
+            self.buckets.setdefault(band, []).append(key)
+
+    def query(self, signature: np.ndarray) -> Optional[str]:
+        best_key, best_score = None, self.threshold
+        seen = set()
+        for band in self._bands(signature):
+            for key in self.buckets.get(band, []):
+                if key in seen:
+                    continue
+                seen.add(key)
+                score = similarity(signature, self.signatures[key])
+                if score >= best_score:
+                    best_key, best_score = key, score
+        return self.representatives[best_key] if best_key else None
+
+
+class Deduplicator:
+    def __init__(self, repo: Repository, window_hours: int = DEDUP_WINDOW_HOURS):
+        self.repo = repo
+        self.index = DedupIndex()
+        self.duplicates: Dict[str, Tuple[dict, str]] = {}
+        self._new_signatures: Dict[str, bytes] = {}
+        for key, signature in repo.get_recent_signatures(window_hours).items():
+            self.index.add(key, np.frombuffer(signature, dtype=np.uint32))
+
+    def filter(self, articles: Iterable[dict]) -> Iterator[dict]:
+        for article in articles:
+            key = f"{article['type']}:{article['id']}"
+            signature = article_signature(article)
+            representative = self.index.query(signature)
+            self.index.add(key, signature, representative)
+            self._new_signatures[key] = signature.tobytes()
+            if representative:
+                self.duplicates[key] = (article, representative)
+                continue
+            yield article
+
+    def link(self) -> int:
+        self.repo.save_signatures(self._new_signatures)
+        self._new_signatures = {}
+        if not self.duplicates:
+            return 0
+        
+        representatives = self.repo.get_digests_by_ids(list({rep for _, rep in self.duplicates.values()}))
+        linked = 0
+        for key, (article, representative) in self.duplicates.items():
+            digest = representatives.get(representative)
+            if not digest:
+                continue
+            self.repo.create_digest(
+                article_type=article["type"],
+                article_id=article["id"],
+                url=article["url"],
+                title=digest["title"],
+                summary=digest["summary"],
+                published_at=article.get("published_at"),
+                duplicate_of=representative
+            )
+            linked += 1
+        self.duplicates = {}
+        return linked
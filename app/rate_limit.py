@@ -0,0 +1,48 @@
+import threading
+import time
+from typing import Dict, Tuple
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def credit(self, tokens: float) -> None:
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+
+_buckets: Dict[Tuple[str, float, float], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(key: str, rate: float, capacity: float) -> TokenBucket:
+    with _buckets_lock:
+        if (key, rate, capacity) not in _buckets:
+            _buckets[(key, rate, capacity)] = TokenBucket(rate, capacity)
+        return _buckets[(key, rate, capacity)]
@@ -0,0 +1,149 @@
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+from app.config import YOUTUBE_CHANNELS
+from app.profiles.user_profile import USER_PROFILE
+from app.scrapers.anthropic import AnthropicScraper
+from app.scrapers.openai import OpenAIScraper
+from app.scrapers.youtube import YouTubeScraper
+
+VOCABULARY = (
+    "model models agent agents reasoning benchmark benchmarks training inference latency throughput token tokens "
+    "context window retrieval embedding embeddings vector database fine-tuning alignment safety evaluation eval "
+    "dataset datasets transformer attention sparse dense mixture experts routing distillation quantization "
+    "open-source release preview api developers enterprise pricing cost compute gpu gpus cluster scaling laws "
+    "multimodal vision audio speech video code coding assistant tool tools function calling structured outputs "
+    "memory planning research paper results accuracy improvement percent faster cheaper larger smaller new "
+    "announced introduces launches shows demonstrates outperforms compared baseline previous state-of-the-art "
+    "users teams workflows production deployment latency-sensitive batch streaming realtime robust reliable"
+).split()
+
+SHARES = {"youtube": 0.4, "openai": 0.3, "anthropic": 0.3}
+
+
+def synthetic_profiles(count: int, seed: int = 0, interests: int = 6) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            **USER_PROFILE,
+            "id": f"synthetic-{i:05d}",
+            "name": f"Reader {i}",
+            "email": f"reader{i}@example.com",
+            "interests": [" ".join(rng.choices(VOCABULARY, k=3)) for _ in range(interests)]
+        }
+        for i in range(count)
+    ]
+
+
+class SyntheticCorpus:
+    def __init__(self, size: int, seed: int = 0, hours: int = 24, long_fraction: float = 0.05,
+                 duplicate_fraction: float = 0.05, transcript_words: int = 1200, markdown_words: int = 700,
+                 long_words: int = 9000):
+        self.size = size
+        self.hours = hours
+        self.long_fraction = long_fraction
+        self.duplicate_fraction = duplicate_fraction
+        self.transcript_words = transcript_words
+        self.markdown_words = markdown_words
+        self.long_words = long_words
+        self._random = random.Random(seed)
+        self.now = datetime.now(timezone.utc)
+        self.feeds: Dict[str, bytes] = {}
+        self.transcripts: Dict[str, str] = {}
+        self.markdowns: Dict[str, str] = {}
+        self._build()
+
+    def _text(self, words: int) -> str:
+        tokens = self._random.choices(VOCABULARY, k=words)
+        sentences = []
+        for i in range(0, len(tokens), 15):
+            sentence = " ".join(tokens[i:i + 15])
+            sentences.append(sentence[:1].upper() + sentence[1:] + ".")
+        return " ".join(sentences)
+
+    def _body(self, words: int, previous: List[str]) -> str:
+        if previous and self._random.random() < self.duplicate_fraction:
+            tokens = self._random.choice(previous).split()
+            for _ in range(max(1, len(tokens) // 50)):
+                tokens[self._random.randrange(len(tokens))] = self._random.choice(VOCABULARY)
+            return " ".join(tokens)
+        if self._random.random() < self.long_fraction:
+            words = self.long_words
+        return self._text(words)
+
+    def _published(self) -> datetime:
+        return self.now - timedelta(hours=self._random.uniform(0, self.hours * 0.9))
+
+    def _title(self) -> str:
+        return " ".join(self._random.choices(VOCABULARY, k=self._random.randint(5, 10))).title()
+
+    def _counts(self) -> Dict[str, int]:
+        counts = {source: int(self.size * share) for source, share in SHARES.items()}
+        counts["youtube"] += self.size - sum(counts.values())
+        return counts
+
+    def _youtube_feed(self, channel_id: str, count: int) -> bytes:
+        entries = []
+        bodies: List[str] = []
+        for i in range(count):
+            video_id = f"{channel_id[-6:]}v{i:07d}"
+            body = self._body(self.transcript_words, bodies)
+            bodies.append(body)
+            self.transcripts[video_id] = body
+            entries.append(
+                f"<entry><id>yt:video:{video_id}</id><title>{escape(self._title())}</title>"
+                f"<link rel=\"alternate\" href=\"https://www.youtube.com/watch?v={video_id}\"/>"
+                f"<published>{self._published().strftime('%Y-%m-%dT%H:%M:%S+00:00')}</published>"
+                f"<summary>{escape(self._text(40))}</summary></entry>"
+            )
+        return (
+            "<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
+            "<feed xmlns=\"http://www.w3.org/2005/Atom\">"
+            f"<title>Synthetic channel {channel_id}</title>{''.join(entries)}</feed>"
+        ).encode("utf-8")
+
+    def _rss_feed(self, name: str, items: List[str]) -> bytes:
+        return (
+            "<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
+            f"<rss version=\"2.0\"><channel><title>{escape(name)}</title>{''.join(items)}</channel></rss>"
+        ).encode("utf-8")
+
+    def _rss_item(self, url: str, description: str) -> str:
+        return (
+            f"<item><title>{escape(self._title())}</title><link>{escape(url)}</link><guid>{escape(url)}</guid>"
+            f"<description>{escape(description)}</description>"
+            f"<pubDate>{format_datetime(self._published())}</pubDate><category>Research</category></item>"
+        )
+
+    def _build(self) -> None:
+        counts = self._counts()
+        
+        youtube = YouTubeScraper()
+        channels = YOUTUBE_CHANNELS or ["synthetic-channel"]
+        per_channel = [counts["youtube"] // len(channels)] * len(channels)
+        per_channel[0] += counts["youtube"] - sum(per_channel)
+        for channel_id, count in zip(channels, per_channel):
+            self.feeds[youtube.get_rss_url(channel_id)] = self._youtube_feed(channel_id, count)
+        
+        openai_items = []
+        descriptions: List[str] = []
+        for i in range(counts["openai"]):
+            description = self._body(80, descriptions)
+            descriptions.append(description)
+            openai_items.append(self._rss_item(f"https://openai.com/index/synthetic-{i}", description))
+        self.feeds[OpenAIScraper().rss_url] = self._rss_feed("OpenAI News", openai_items)
+        
+        rss_urls = AnthropicScraper().rss_urls
+        anthropic_items: Dict[str, List[str]] = {url: [] for url in rss_urls}
+        bodies: List[str] = []
+        for i in range(counts["anthropic"]):
+            url = f"https://www.anthropic.com/news/synthetic-{i}"
+            body = self._body(self.markdown_words, bodies)
+            bodies.append(body)
+            self.markdowns[url] = f"# Synthetic article {i}\n\n{body}"
+            anthropic_items[rss_urls[i % len(rss_urls)]].append(self._rss_item(url, self._text(30)))
+        for rss_url, items in anthropic_items.items():
+            self.feeds[rss_url] = self._rss_feed("Anthropic", items)
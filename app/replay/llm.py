@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import re
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from app.agent.embeddings import HashingEmbedder
+from app.agent.telemetry import usage_counts
+from app.replay.store import FixtureStore, LatencyModel, request_key
+
+ID_PATTERN = re.compile(r"^ID: (.+)$", re.MULTILINE)
+TITLE_PATTERN = re.compile(r"Title: (.*?) \n")
+INTRODUCTION_PATTERN = re.compile(r"Create an email introduction for (.+?) for (.+?)\.")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def parse_key(kwargs: dict) -> str:
+    return request_key({
+        "model": kwargs["model"],
+        "instructions": kwargs.get("instructions"),
+        "input": kwargs["input"],
+        "format": kwargs["text_format"].__name__
+    })
+
+
+def embed_key(model: str, texts: List[str]) -> str:
+    return request_key({"model": model, "input": texts})
+
+
+def _usage(input_tokens: int, cached_tokens: int, output_tokens: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        input_tokens=input_tokens,
+        prompt_tokens=input_tokens,
+        input_tokens_details=SimpleNamespace(cached_tokens=cached_tokens),
+        output_tokens=output_tokens,
+        total_tokens=input_tokens + output_tokens
+    )
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _sentences(text: str, count: int) -> str:
+    return " ".join(SENTENCE_PATTERN.split(text.strip())[:count])[:600]
+
+
+def _score(digest_id: str) -> float:
+    return int(hashlib.blake2b(digest_id.encode("utf-8"), digest_size=4).hexdigest(), 16) % 1001 / 100
+
+
+class SyntheticResponder:
+    def __init__(self, embedding_dimensions: int = 256):
+        self.embedder = HashingEmbedder(embedding_dimensions)
+        self.handlers: Dict[str, Callable[[str], dict]] = {
+            "DigestOutput": self._digest,
+            "ChunkSummary": self._chunk_summary,
+            "ScoredDigestList": self._scored,
+            "RankedDigestList": self._ranked,
+            "EmailIntroduction": self._introduction
+        }
+
+    def _digest(self, prompt: str) -> dict:
+        title = TITLE_PATTERN.search(prompt)
+        content = prompt.split("Content: ", 1)[-1]
+        return {"title": f"Digest: {title.group(1)[:60] if title else 'Untitled'}", "summary": _sentences(content, 2)}
+
+    def _chunk_summary(self, prompt: str) -> dict:
+        return {"summary": _sentences(prompt.split(": \n ", 1)[-1], 3)}
+
+    def _scored(self, prompt: str) -> dict:
+        return {"articles": [
+            {"digest_id": digest_id, "relevance_score": _score(digest_id), "reasoning": "Synthetic score"}
+            for digest_id in ID_PATTERN.findall(prompt)
+        ]}
+
+    def _ranked(self, prompt: str) -> dict:
+        ids = sorted(ID_PATTERN.findall(prompt), key=_score, reverse=True)
+        return {"articles": [
+            {"digest_id": digest_id, "relevance_score": _score(digest_id), "rank": rank, "reasoning": "Synthetic rank"}
+            for rank, digest_id in enumerate(ids, 1)
+        ]}
+
+    def _introduction(self, prompt: str) -> dict:
+        match = INTRODUCTION_PATTERN.search(prompt)
+        name, date = match.groups() if match else ("there", "today")
+        return {
+            "greeting": f"Hey {name}, here is your daily digest of AI news for {date}.",
+            "introduction": "Here is a synthetic overview of today's top ranked articles."
+        }
+
+    def parse(self, kwargs: dict):
+        text_format = kwargs["text_format"]
+        handler = self.handlers.get(text_format.__name__)
+        if handler is None:
+            raise KeyError(f"No synthetic response for {text_format.__name__}")
+        parsed = text_format.model_validate(handler(kwargs["input"]))
+        prompt_tokens = _approx_tokens(f"{kwargs.get('instructions') or ''}{kwargs['input']}")
+        return SimpleNamespace(output_parsed=parsed, usage=_usage(prompt_tokens, 0, _approx_tokens(parsed.model_dump_json())))
+
+    def embed(self, model: str, texts: List[str]):
+        vectors = self.embedder.embed(texts)
+        tokens = sum(_approx_tokens(text) for text in texts)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=row.tolist()) for row in vectors], usage=_usage(tokens, 0, 0))
+
+
+def _record_usage(response) -> List[int]:
+    return list(usage_counts(response))
+
+
+class ReplayBackend:
+    def __init__(self, store: Optional[FixtureStore] = None, responder: Optional[SyntheticResponder] = None):
+        self.store = store
+        self.responder = responder
+
+    def parse(self, kwargs: dict):
+        recorded = self.store.get("responses", parse_key(kwargs)) if self.store else None
+        if recorded is not None:
+            output = recorded["output"]
+            return SimpleNamespace(
+                output_parsed=kwargs["text_format"].model_validate(output) if output is not None else None,
+                usage=_usage(*recorded["usage"])
+            )
+        if self.responder is None:
+            raise KeyError(f"No recorded {kwargs['text_format'].__name__} response for {kwargs['model']}")
+        return self.responder.parse(kwargs)
+
+    def embed(self, model: str, texts: List[str]):
+        recorded = self.store.get("embeddings", embed_key(model, texts)) if self.store else None
+        if recorded is not None:
+            return SimpleNamespace(
+                data=[SimpleNamespace(embedding=vector) for vector in recorded["vectors"]],
+                usage=_usage(*recorded["usage"])
+            )
+        if self.responder is None:
+            raise KeyError(f"No recorded embeddings for {model}")
+        return self.responder.embed(model, texts)
+
+
+class ReplayOpenAI:
+    def __init__(self, backend: ReplayBackend, latency: Optional[LatencyModel] = None):
+        self.backend = backend
+        self.latency = latency or LatencyModel()
+        self.responses = SimpleNamespace(parse=self._parse)
+        self.embeddings = SimpleNamespace(create=self._embed)
+
+    def _parse(self, **kwargs):
+        self.latency.sleep()
+        return self.backend.parse(kwargs)
+
+    def _embed(self, model: str, input: List[str], **kwargs):
+        self.latency.sleep()
+        return self.backend.embed(model, input)
+
+
+class AsyncReplayOpenAI:
+    def __init__(self, backend: ReplayBackend, latency: Optional[LatencyModel] = None):
+        self.backend = backend
+        self.latency = latency or LatencyModel()
+        self.responses = SimpleNamespace(parse=self._parse)
+        self.embeddings = SimpleNamespace(create=self._embed)
+
+    async def _parse(self, **kwargs):
+        await asyncio.sleep(self.latency.delay())
+        return self.backend.parse(kwargs)
+
+    async def _embed(self, model: str, input: List[str], **kwargs):
+        await asyncio.sleep(self.latency.delay())
+        return self.backend.embed(model, input)
+
+
+class RecordingOpenAI:
+    def __init__(self, client, store: FixtureStore):
+        self.client = client
+        self.store = store
+        self.responses = SimpleNamespace(parse=self._parse)
+        self.embeddings = SimpleNamespace(create=self._embed)
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+    def _parse(self, **kwargs):
+        response = self.client.responses.parse(**kwargs)
+        output = response.output_parsed.model_dump() if response.output_parsed is not None else None
+        self.store.put("responses", parse_key(kwargs), {"output": output, "usage": _record_usage(response)})
+        return response
+
+    def _embed(self, model: str, input: List[str], **kwargs):
+        response = self.client.embeddings.create(model=model, input=input, **kwargs)
+        vectors = [item.embedding for item in response.data]
+        self.store.put("embeddings", embed_key(model, input), {"vectors": vectors, "usage": _record_usage(response)})
+        return response
+
+
+class AsyncRecordingOpenAI:
+    def __init__(self, client, store: FixtureStore):
+        self.client = client
+        self.store = store
+        self.responses = SimpleNamespace(parse=self._parse)
+        self.embeddings = SimpleNamespace(create=self._embed)
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+    async def _parse(self, **kwargs):
+        response = await self.client.responses.parse(**kwargs)
+        output = response.output_parsed.model_dump() if response.output_parsed is not None else None
+        self.store.put("responses", parse_key(kwargs), {"output": output, "usage": _record_usage(response)})
+        return response
+
+    async def _embed(self, model: str, input: List[str], **kwargs):
+        response = await self.client.embeddings.create(model=model, input=input, **kwargs)
+        vectors = [item.embedding for item in response.data]
+        self.store.put("embeddings", embed_key(model, input), {"vectors": vectors, "usage": _record_usage(response)})
+        return response
@@ -0,0 +1,122 @@
+import base64
+import hashlib
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Mapping, Optional
+
+from app.replay.store import FixtureStore, LatencyModel
+from app.scrapers.fetch import FeedFetcher, FeedResponse
+
+
+class ReplayFeedFetcher(FeedFetcher):
+    def __init__(self, feeds: Mapping[str, bytes], latency: Optional[LatencyModel] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.feeds = feeds
+        self.latency = latency or LatencyModel()
+
+    @classmethod
+    def from_store(cls, store: FixtureStore, latency: Optional[LatencyModel] = None) -> "ReplayFeedFetcher":
+        return cls({url: base64.b64decode(content) for url, content in store.items("feeds").items()}, latency)
+
+    def fetch(self, url: str, state: Optional[Dict[str, Any]] = None) -> FeedResponse:
+        with self._host_limit(url):
+            self.latency.sleep()
+        content = self.feeds.get(url)
+        if content is None:
+            return FeedResponse(url=url, status=404, error="HTTP 404")
+        content_hash = hashlib.sha256(content).hexdigest()
+        unchanged = content_hash == (state or {}).get("content_hash")
+        return FeedResponse(
+            url=url,
+            status=200,
+            content=None if unchanged else content,
+            content_hash=content_hash,
+            unchanged=unchanged
+        )
+
+
+class RecordingFeedFetcher(FeedFetcher):
+    def __init__(self, store: FixtureStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def fetch(self, url: str, state: Optional[Dict[str, Any]] = None) -> FeedResponse:
+        response = super().fetch(url)
+        if response.content is not None:
+            self.store.put("feeds", url, base64.b64encode(response.content).decode("ascii"))
+        return response
+
+
+def _transcript(text: str) -> SimpleNamespace:
+    return SimpleNamespace(snippets=[SimpleNamespace(text=text)])
+
+
+class ReplayTranscriptApi:
+    def __init__(self, transcripts: Mapping[str, str], latency: Optional[LatencyModel] = None):
+        self.transcripts = transcripts
+        self.latency = latency or LatencyModel()
+
+    @classmethod
+    def from_store(cls, store: FixtureStore, latency: Optional[LatencyModel] = None) -> "ReplayTranscriptApi":
+        return cls(store.items("transcripts"), latency)
+
+    def fetch(self, video_id: str):
+        self.latency.sleep()
+        if video_id not in self.transcripts:
+            raise KeyError(f"No transcript for {video_id}")
+        return _transcript(self.transcripts[video_id])
+
+
+class RecordingTranscriptApi:
+    def __init__(self, api, store: FixtureStore):
+        self.api = api
+        self.store = store
+
+    def fetch(self, video_id: str):
+        transcript = self.api.fetch(video_id)
+        text = " ".join(snippet.text for snippet in transcript.snippets)
+        self.store.put("transcripts", video_id, text)
+        return _transcript(text)
+
+
+def _conversion(markdown: str) -> SimpleNamespace:
+    return SimpleNamespace(document=SimpleNamespace(export_to_markdown=lambda: markdown))
+
+
+class ReplayConverter:
+    def __init__(self, markdowns: Mapping[str, str], latency: Optional[LatencyModel] = None):
+        self.markdowns = markdowns
+        self.latency = latency or LatencyModel()
+
+    @classmethod
+    def from_store(cls, store: FixtureStore, latency: Optional[LatencyModel] = None) -> "ReplayConverter":
+        return cls(store.items("markdowns"), latency)
+
+    def convert(self, url: str):
+        self.latency.sleep()
+        if url not in self.markdowns:
+            raise KeyError(f"No markdown for {url}")
+        return _conversion(self.markdowns[url])
+
+
+class RecordingConverter:
+    def __init__(self, converter, store: FixtureStore):
+        self.converter = converter
+        self.store = store
+
+    def convert(self, url: str):
+        markdown = self.converter.convert(url).document.export_to_markdown()
+        self.store.put("markdowns", url, markdown)
+        return _conversion(markdown)
+
+
+class CapturingSender:
+    def __init__(self, latency: Optional[LatencyModel] = None):
+        self.latency = latency or LatencyModel()
+        self.messages: List[dict] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, subject: str, body_text: str, body_html: Optional[str] = None, recipients: Optional[list] = None):
+        self.latency.sleep()
+        with self._lock:
+            self.messages.append({"subject": subject, "body_text": body_text, "body_html": body_html, "recipients": recipients})
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def request_key(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class LatencyModel:
+    def __init__(self, mean_ms: float = 0.0, jitter_ms: float = 0.0, seed: Optional[int] = None):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        if self.mean_ms <= 0:
+            return 0.0
+        with self._lock:
+            ms = self._random.gauss(self.mean_ms, self.jitter_ms) if self.jitter_ms > 0 else self.mean_ms
+        return max(0.0, ms) / 1000
+
+    def sleep(self) -> None:
+        delay = self.delay()
+        if delay:
+            time.sleep(delay)
+
+
+class FixtureStore:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _file(self, kind: str) -> Path:
+        return self.path / f"{kind}.jsonl"
+
+    def _load(self, kind: str) -> Dict[str, Any]:
+        if kind not in self._data:
+            records = {}
+            if self._file(kind).exists():
+                with open(self._file(kind), encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            record = json.loads(line)
+                            records[record["key"]] = record["value"]
+            self._data[kind] = records
+        return self._data[kind]
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._load(kind).get(key)
+
+    def items(self, kind: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._load(kind))
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        with self._lock:
+            self._load(kind)[key] = value
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self._file(kind), "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "value": value}) + "\n")
@@ -1,74 +1,90 @@
-from typing import List
+from typing import List, Optional
 from .config import YOUTUBE_CHANNELS
 from .scrapers.youtube import YouTubeScraper, ChannelVideo
 from .scrapers.openai import OpenAIScraper, OpenAIArticle
 from .scrapers.anthropic import AnthropicScraper, AnthropicArticle
+from .scrapers.fetch import FeedFetcher
 from .database.repository import Repository
 
 
-def run_scrapers(hours: int = 24) -> dict:
+def run_scrapers(hours: int = 24, fetcher: Optional[FeedFetcher] = None) -> dict:
     youtube_scraper = YouTubeScraper()
     openai_scraper = OpenAIScraper()
     anthropic_scraper = AnthropicScraper()
-    repo = Repository()
-    
-    youtube_videos = []
-    video_dicts = []
-    for channel_id in YOUTUBE_CHANNELS:
-        videos = youtube_scraper.get_latest_videos(channel_id, hours=hours)
-        youtube_videos.extend(videos)
-        video_dicts.extend([
-            {
-                "video_id": v.video_id,
-                "title": v.title,
-                "url": v.url,
-                "channel_id": channel_id,
-                "published_at": v.published_at,
-                "description": v.description,
-                "transcript": v.transcript
-            }
-            for v in videos
-        ])
-    
-    openai_articles = openai_scraper.get_articles(hours=hours)
-    anthropic_articles = anthropic_scraper.get_articles(hours=hours)
-    
-    if video_dicts:
-        repo.bulk_create_youtube_videos(video_dicts)
-    
-    if openai_articles:
-        article_dicts = [
-            {
-                "guid": a.guid,
-                "title": a.title,
-                "url": a.url,
-                "published_at": a.published_at,
-                "description": a.description,
-                "category": a.category
-            }
-            for a in openai_articles
-        ]
-        repo.bulk_create_openai_articles(article_dicts)
-    
-    if anthropic_articles:
-        article_dicts = [
-            {
-                "guid": a.guid,
-                "title": a.title,
-                "url": a.url,
-                "published_at": a.published_at,
-                "description": a.description,
-                "category": a.category
-            }
-            for a in anthropic_articles
-        ]
-        repo.bulk_create_anthropic_articles(article_dicts)
-    
-    return {
-        "youtube": youtube_videos,
-        "openai": openai_articles,
-        "anthropic": anthropic_articles,
-    }
+    fetcher = fetcher or FeedFetcher()
+    with Repository() as repo:
+        channel_urls = {channel_id: youtube_scraper.get_rss_url(channel_id) for channel_id in YOUTUBE_CHANNELS}
+        feed_urls = list(channel_urls.values()) + [openai_scraper.rss_url] + anthropic_scraper.rss_urls
+        responses = fetcher.fetch_all(feed_urls, states=repo.get_feed_states(feed_urls))
+        feeds = {url: r.content for url, r in responses.items() if r.ok}
+        for url, r in responses.items():
+            if r.error:
+                print(f"Error fetching feed {url}: {r.error}")
+        
+        youtube_videos = []
+        video_dicts = []
+        for channel_id, rss_url in channel_urls.items():
+            if rss_url not in feeds:
+                continue
+            videos = youtube_scraper.get_latest_videos(channel_id, hours=hours, content=feeds[rss_url])
+            youtube_videos.extend(videos)
+            video_dicts.extend([
+                {
+                    "video_id": v.video_id,
+                    "title": v.title,
+                    "url": v.url,
+                    "channel_id": channel_id,
+                    "published_at": v.published_at,
+                    "description": v.description,
+                    "transcript": v.transcript
+                }
+                for v in videos
+            ])
+        
+        openai_articles = []
+        if openai_scraper.rss_url in feeds:
+            openai_articles = openai_scraper.get_articles(hours=hours, content=feeds[openai_scraper.rss_url])
+        anthropic_articles = anthropic_scraper.get_articles(hours=hours, contents=feeds)
+        
+        if video_dicts:
+            repo.bulk_create_youtube_videos(video_dicts)
+        
+        if openai_articles:
+            article_dicts = [
+                {
+                    "guid": a.guid,
+                    "title": a.title,
+                    "url": a.url,
+                    "published_at": a.published_at,
+                    "description": a.description,
+                    "category": a.category
+                }
+                for a in openai_articles
+            ]
+            repo.bulk_create_openai_articles(article_dicts)
+        
+        if anthropic_articles:
+            article_dicts = [
+                {
+                    "guid": a.guid,
+                    "title": a.title,
+                    "url": a.url,
+                    "published_at": a.published_at,
+                    "description": a.description,
+                    "category": a.category
+                }
+                for a in anthropic_articles
+            ]
+            repo.bulk_create_anthropic_articles(article_dicts)
+        
+        repo.save_feed_states([r.to_state() for r in responses.values() if r.has_state])
+        
+        return {
+            "youtube": youtube_videos,
+            "openai": openai_articles,
+            "anthropic": anthropic_articles,
+            "unchanged_feeds": sum(1 for r in responses.values() if r.unchanged),
+        }
 
 
 if __name__ == "__main__":
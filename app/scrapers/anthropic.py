@@ -1,10 +1,24 @@
+import threading
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional
 import feedparser
-from docling.document_converter import DocumentConverter
 from pydantic import BaseModel
 
 
+_converter = None
+_converter_lock = threading.Lock()
+
+
+def get_converter():
+    global _converter
+    if _converter is None:
+        with _converter_lock:
+            if _converter is None:
+                from docling.document_converter import DocumentConverter
+                _converter = DocumentConverter()
+    return _converter
+
+
 class AnthropicArticle(BaseModel):
     title: str
     description: str
@@ -15,22 +29,31 @@ class AnthropicArticle(BaseModel):
 
 
 class AnthropicScraper:
-    def __init__(self):
+    def __init__(self, converter=None):
+        self._converter = converter
         self.rss_urls = [
             "https://raw.githubusercontent.com/Olshansk/rss-feeds/main/feeds/feed_anthropic_news.xml",
             "https://raw.githubusercontent.com/Olshansk/rss-feeds/main/feeds/feed_anthropic_research.xml",
             "https://raw.githubusercontent.com/Olshansk/rss-feeds/main/feeds/feed_anthropic_engineering.xml",
         ]
-        self.converter = DocumentConverter()
 
-    def get_articles(self, hours: int = 24) -> List[AnthropicArticle]:
+    @property
+    def converter(self):
+        return self._converter or get_converter()
+
+    def get_articles(self, hours: int = 24, contents: Optional[Dict[str, bytes]] = None) -> List[AnthropicArticle]:
         now = datetime.now(timezone.utc)
         cutoff_time = now - timedelta(hours=hours)
         articles = []
         seen_guids = set()
         
         for rss_url in self.rss_urls:
-            feed = feedparser.parse(rss_url)
+            if contents is not None:
+                if rss_url not in contents:
+                    continue
+                feed = feedparser.parse(contents[rss_url])
+            else:
+                feed = feedparser.parse(rss_url)
             if not feed.entries:
                 continue
             
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+import requests
+from pydantic import BaseModel
+
+from app.config import FEED_FETCH_WORKERS, FEED_PER_HOST_LIMIT, FEED_FETCH_TIMEOUT
+
+
+USER_AGENT = "ai-news-aggregator/0.1 (+feedfetcher)"
+
+
+class FeedResponse(BaseModel):
+    url: str
+    status: int = 0
+    content: Optional[bytes] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    unchanged: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.content is not None
+
+    @property
+    def has_state(self) -> bool:
+        return self.error is None and self.status in (200, 304)
+
+    def to_state(self) -> dict:
+        return {
+            "url": self.url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "content_hash": self.content_hash
+        }
+
+
+class FeedFetcher:
+    def __init__(self, max_workers: int = FEED_FETCH_WORKERS, per_host_limit: int = FEED_PER_HOST_LIMIT,
+                 timeout: float = FEED_FETCH_TIMEOUT):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+            self._local.session = session
+        return session
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def fetch(self, url: str, state: Optional[Dict[str, Any]] = None) -> FeedResponse:
+        state = state or {}
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+        
+        with self._host_limit(url):
+            try:
+                response = self._session().get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                return FeedResponse(url=url, error=str(e))
+        
+        if response.status_code == 304:
+            return FeedResponse(
+                url=url,
+                status=304,
+                etag=response.headers.get("ETag") or state.get("etag"),
+                last_modified=response.headers.get("Last-Modified") or state.get("last_modified"),
+                content_hash=state.get("content_hash"),
+                unchanged=True
+            )
+        if response.status_code != 200:
+            return FeedResponse(url=url, status=response.status_code, error=f"HTTP {response.status_code}")
+        
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        unchanged = content_hash == state.get("content_hash")
+        return FeedResponse(
+            url=url,
+            status=response.status_code,
+            content=None if unchanged else response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_hash=content_hash,
+            unchanged=unchanged
+        )
+
+    def fetch_all(self, urls: List[str], states: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, FeedResponse]:
+        states = states or {}
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique_urls))) as executor:
+            responses = executor.map(lambda url: self.fetch(url, states.get(url)), unique_urls)
+            return dict(zip(unique_urls, responses))
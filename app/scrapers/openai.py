@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 import feedparser
-from docling.document_converter import DocumentConverter
 from pydantic import BaseModel
 
 
@@ -17,10 +16,9 @@ class OpenAIArticle(BaseModel):
 class OpenAIScraper:
     def __init__(self):
         self.rss_url = "https://openai.com/news/rss.xml"
-        self.converter = DocumentConverter()
 
-    def get_articles(self, hours: int = 24) -> List[OpenAIArticle]:
-        feed = feedparser.parse(self.rss_url)
+    def get_articles(self, hours: int = 24, content: Optional[bytes] = None) -> List[OpenAIArticle]:
+        feed = feedparser.parse(content if content is not None else self.rss_url)
         if not feed.entries:
             return []
         
@@ -3,9 +3,6 @@ from typing import List, Optional
 import os
 import feedparser
 from pydantic import BaseModel
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
-from youtube_transcript_api.proxies import WebshareProxyConfig
 
 
 class Transcript(BaseModel):
@@ -22,20 +19,30 @@ class ChannelVideo(BaseModel):
 
 
 class YouTubeScraper:
-    def __init__(self):
-        proxy_config = None
-        proxy_username = os.getenv("PROXY_USERNAME")
-        proxy_password = os.getenv("PROXY_PASSWORD")
-        
-        if proxy_username and proxy_password:
-            proxy_config = WebshareProxyConfig(
-                proxy_username=proxy_username,
-                proxy_password=proxy_password
-            )
-        
-        self.transcript_api = YouTubeTranscriptApi(proxy_config=proxy_config)
+    def __init__(self, transcript_api=None):
+        self.proxy_username = os.getenv("PROXY_USERNAME")
+        self.proxy_password = os.getenv("PROXY_PASSWORD")
+        self.egress = "direct"
+        if self.proxy_username and self.proxy_password:
+            self.egress = f"webshare:{self.proxy_username}"
+        self._transcript_api = transcript_api
 
-    def _get_rss_url(self, channel_id: str) -> str:
+    @property
+    def transcript_api(self):
+        if self._transcript_api is None:
+            from youtube_transcript_api import YouTubeTranscriptApi
+            from youtube_transcript_api.proxies import WebshareProxyConfig
+            
+            proxy_config = None
+            if self.proxy_username and self.proxy_password:
+                proxy_config = WebshareProxyConfig(
+                    proxy_username=self.proxy_username,
+                    proxy_password=self.proxy_password
+                )
+            self._transcript_api = YouTubeTranscriptApi(proxy_config=proxy_config)
+        return self._transcript_api
+
+    def get_rss_url(self, channel_id: str) -> str:
         return f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
 
     def _extract_video_id(self, video_url: str) -> str:
@@ -48,6 +55,8 @@ class YouTubeScraper:
         return video_url
 
     def get_transcript(self, video_id: str) -> Optional[Transcript]:
+        from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
+        
         try:
             transcript = self.transcript_api.fetch(video_id)
             text = " ".join([snippet.text for snippet in transcript.snippets])
@@ -57,8 +66,8 @@ class YouTubeScraper:
         except Exception:
             return None
 
-    def get_latest_videos(self, channel_id: str, hours: int = 24) -> list[ChannelVideo]:
-        feed = feedparser.parse(self._get_rss_url(channel_id))
+    def get_latest_videos(self, channel_id: str, hours: int = 24, content: Optional[bytes] = None) -> list[ChannelVideo]:
+        feed = feedparser.parse(content if content is not None else self.get_rss_url(channel_id))
         if not feed.entries:
             return []
         
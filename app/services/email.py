@@ -1,18 +1,131 @@
 import os
 import smtplib
+import ssl
+import threading
+import time
 import html
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
 import markdown
 
+from app.config import (
+    SMTP_HOST, SMTP_PORT, SMTP_SECURITY, SMTP_TIMEOUT, SMTP_POOL_SIZE, SMTP_MAX_MESSAGES_PER_CONNECTION,
+    SMTP_IDLE_TIMEOUT, SMTP_RATE_PER_SECOND, SMTP_BURST
+)
+from app.rate_limit import get_bucket
+
 load_dotenv()
 
 MY_EMAIL = os.getenv("MY_EMAIL")
 APP_PASSWORD = os.getenv("APP_PASSWORD")
 
 
-def send_email(subject: str, body_text: str, body_html: str = None, recipients: list = None):
+class SMTPPool:
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, security: str = SMTP_SECURITY,
+                 username: Optional[str] = MY_EMAIL, password: Optional[str] = APP_PASSWORD,
+                 size: int = SMTP_POOL_SIZE, max_messages: int = SMTP_MAX_MESSAGES_PER_CONNECTION,
+                 idle_timeout: float = SMTP_IDLE_TIMEOUT, timeout: float = SMTP_TIMEOUT,
+                 rate: float = SMTP_RATE_PER_SECOND, burst: float = SMTP_BURST):
+        if security not in ("ssl", "starttls", "none"):
+            raise ValueError(f"Unknown SMTP_SECURITY {security!r}, expected ssl, starttls or none")
+        self.host = host
+        self.port = port
+        self.security = security
+        self.username = username
+        self.password = password
+        self.size = size
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.bucket = get_bucket(f"smtp:{host}:{port}", rate, burst)
+        self._idle: List[Tuple[smtplib.SMTP, int, float]] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.security == "ssl":
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout, context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == "starttls":
+                smtp.starttls(context=ssl.create_default_context())
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        return smtp
+
+    def _close(self, smtp: smtplib.SMTP) -> None:
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def _checkout(self) -> Tuple[smtplib.SMTP, int]:
+        stale = []
+        connection = None
+        with self._lock:
+            while self._idle and connection is None:
+                smtp, sent, released_at = self._idle.pop()
+                if time.monotonic() - released_at < self.idle_timeout:
+                    connection = (smtp, sent)
+                else:
+                    stale.append(smtp)
+        for smtp in stale:
+            self._close(smtp)
+        return connection or (self._connect(), 0)
+
+    def _checkin(self, smtp: smtplib.SMTP, sent: int) -> None:
+        if sent >= self.max_messages:
+            self._close(smtp)
+            return
+        with self._lock:
+            self._idle.append((smtp, sent, time.monotonic()))
+
+    def _deliver(self, smtp: smtplib.SMTP, sent: int, from_addr: str, recipients: List[str], message: str) -> None:
+        try:
+            smtp.sendmail(from_addr, recipients, message)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            smtp.close()
+            raise
+        except smtplib.SMTPException:
+            self._checkin(smtp, sent + 1)
+            raise
+        self._checkin(smtp, sent + 1)
+
+    def send(self, from_addr: str, recipients: List[str], message: str) -> None:
+        self.bucket.acquire()
+        with self._slots:
+            smtp, sent = self._checkout()
+            if sent:
+                try:
+                    return self._deliver(smtp, sent, from_addr, recipients, message)
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    smtp, sent = self._connect(), 0
+            self._deliver(smtp, sent, from_addr, recipients, message)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for smtp, _, _ in idle:
+            self._close(smtp)
+
+
+_pool: Optional[SMTPPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPPool()
+    return _pool
+
+
+def build_message(subject: str, body_text: str, body_html: str = None, recipients: list = None) -> Tuple[List[str], str]:
     if recipients is None:
         if not MY_EMAIL:
             raise ValueError("MY_EMAIL environment variable is not set")
@@ -24,8 +137,6 @@ def send_email(subject: str, body_text: str, body_html: str = None, recipients:
     
     if not MY_EMAIL:
         raise ValueError("MY_EMAIL environment variable is not set")
-    if not APP_PASSWORD:
-        raise ValueError("APP_PASSWORD environment variable is not set")
     
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
@@ -39,9 +150,31 @@ def send_email(subject: str, body_text: str, body_html: str = None, recipients:
         part2 = MIMEText(body_html, "html")
         msg.attach(part2)
     
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-        smtp.login(MY_EMAIL, APP_PASSWORD)
-        smtp.sendmail(MY_EMAIL, recipients, msg.as_string())
+    return recipients, msg.as_string()
+
+
+def send_email(subject: str, body_text: str, body_html: str = None, recipients: list = None, pool: SMTPPool = None):
+    pool = pool or get_smtp_pool()
+    if pool.security != "none" and not pool.password:
+        raise ValueError("APP_PASSWORD environment variable is not set")
+    recipients, message = build_message(subject, body_text, body_html, recipients)
+    pool.send(MY_EMAIL, recipients, message)
+
+
+def send_many(messages: List[dict], sender=None, workers: Optional[int] = None) -> List[Optional[Exception]]:
+    send = sender or send_email
+    
+    def deliver(message: dict) -> Optional[Exception]:
+        try:
+            send(**message)
+            return None
+        except Exception as e:
+            return e
+    
+    if not messages:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers or SMTP_POOL_SIZE, len(messages)))) as executor:
+        return list(executor.map(deliver, messages))
 
 
 def markdown_to_html(markdown_text: str) -> str:
@@ -1,41 +1,69 @@
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
 
+import multiprocessing
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 
-from app.scrapers.anthropic import AnthropicScraper
+from app.config import ANTHROPIC_MARKDOWN_WORKERS, ANTHROPIC_MARKDOWN_BATCH_SIZE, WRITE_FLUSH_INTERVAL
+from app.scrapers.anthropic import AnthropicScraper, get_converter
 from app.database.repository import Repository
 
 
-def process_anthropic_markdown(limit: Optional[int] = None) -> dict:
-    scraper = AnthropicScraper()
-    repo = Repository()
-    
-    articles = repo.get_anthropic_articles_without_markdown(limit=limit)
-    processed = 0
-    failed = 0
-    
-    for article in articles:
-        markdown = scraper.url_to_markdown(article.url)
-        try:
-            if markdown:
-                repo.update_anthropic_article_markdown(article.guid, markdown)
-                processed += 1
-            else:
-                failed += 1
-        except Exception as e:
-            failed += 1
-            print(f"Error processing article {article.guid}: {e}")
-            continue
-    
-    return {
-        "total": len(articles),
-        "processed": processed,
-        "failed": failed
-    }
+_worker_scraper: Optional[AnthropicScraper] = None
+
+
+def _init_worker() -> None:
+    global _worker_scraper
+    _worker_scraper = AnthropicScraper()
+    get_converter()
+
+
+def _convert(guid: str, url: str) -> Tuple[str, Optional[str]]:
+    return guid, _worker_scraper.url_to_markdown(url)
+
+
+def _convert_serial(articles: List[Tuple[str, str]], converter=None) -> Iterator[Tuple[str, Optional[str]]]:
+    scraper = AnthropicScraper(converter=converter)
+    for guid, url in articles:
+        yield guid, scraper.url_to_markdown(url)
+
+
+def _convert_parallel(articles: List[Tuple[str, str]], workers: int) -> Iterator[Tuple[str, Optional[str]]]:
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker
+    ) as executor:
+        futures = [executor.submit(_convert, guid, url) for guid, url in articles]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def process_anthropic_markdown(limit: Optional[int] = None, workers: int = ANTHROPIC_MARKDOWN_WORKERS,
+                               batch_size: int = ANTHROPIC_MARKDOWN_BATCH_SIZE, converter=None) -> dict:
+    with Repository() as repo:
+        articles = [(a.guid, a.url) for a in repo.iter_anthropic_articles_without_markdown(limit=limit)]
+        failed = 0
+        
+        workers = 1 if converter is not None else min(workers, len(articles))
+        results = _convert_parallel(articles, workers) if workers > 1 else _convert_serial(articles, converter)
+        
+        with repo.markdown_writer(batch_size, WRITE_FLUSH_INTERVAL) as writer:
+            for guid, markdown in results:
+                if markdown:
+                    writer.add(guid, markdown)
+                else:
+                    failed += 1
+        
+        return {
+            "total": len(articles),
+            "processed": writer.written,
+            "failed": failed + len(writer.failed)
+        }
 
 
 if __name__ == "__main__":
@@ -43,4 +71,3 @@ if __name__ == "__main__":
     print(f"Total articles: {result['total']}")
     print(f"Processed: {result['processed']}")
     print(f"Failed: {result['failed']}")
-
@@ -1,5 +1,6 @@
 import logging
 import sys
+from typing import List
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -7,7 +8,9 @@ load_dotenv()
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from app.agent.curator_agent import CuratorAgent
+from app.agent.curator_agent import CuratorAgent, RankedArticle
+from app.agent.embeddings import prefilter_digests
+from app.agent.llm import get_scheduler
 from app.profiles.user_profile import USER_PROFILE
 from app.database.repository import Repository
 
@@ -18,51 +21,77 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+DEFAULT_PROFILE_ID = "default"
+
+
+def sync_default_profile(repo: Repository) -> None:
+    repo.save_profiles([{**USER_PROFILE, "id": DEFAULT_PROFILE_ID}])
+
+
+def load_profiles(repo: Repository) -> List[dict]:
+    sync_default_profile(repo)
+    return repo.get_profiles()
+
+
+def load_default_profile(repo: Repository) -> dict:
+    sync_default_profile(repo)
+    return repo.get_profile(DEFAULT_PROFILE_ID)
+
+
+def rank_recent_digests(repo: Repository, curator: CuratorAgent, digests: List[dict]) -> List[RankedArticle]:
+    candidates = prefilter_digests(repo, digests, curator.user_profile)
+    if len(candidates) < len(digests):
+        logger.info(f"Prefiltered to {len(candidates)} candidates by embedding similarity")
+    ranked_articles, counts = curator.rank_digests_incremental(repo, candidates)
+    logger.info(f"Curator scores: {counts['stored']} stored, {counts['scored']} scored this run")
+    get_scheduler().telemetry.flush(repo)
+    return ranked_articles
+
 
 def curate_digests(hours: int = 24) -> dict:
-    curator = CuratorAgent(USER_PROFILE)
-    repo = Repository()
-    
-    digests = repo.get_recent_digests(hours=hours)
-    total = len(digests)
-    
-    if total == 0:
-        logger.warning(f"No digests found from the last {hours} hours")
-        return {"total": 0, "ranked": 0}
-    
-    logger.info(f"Curating {total} digests from the last {hours} hours")
-    logger.info(f"User profile: {USER_PROFILE['name']} - {USER_PROFILE['background']}")
-    
-    ranked_articles = curator.rank_digests(digests)
-    
-    if not ranked_articles:
-        logger.error("Failed to rank digests")
-        return {"total": total, "ranked": 0}
-    
-    logger.info(f"Successfully ranked {len(ranked_articles)} articles")
-    logger.info("\n=== Top 10 Ranked Articles ===")
-    
-    for article in ranked_articles[:10]:
-        digest = next((d for d in digests if d["id"] == article.digest_id), None)
-        if digest:
-            logger.info(f"\nRank {article.rank} | Score: {article.relevance_score:.1f}/10.0")
-            logger.info(f"Title: {digest['title']}")
-            logger.info(f"Type: {digest['article_type']}")
-            logger.info(f"Reasoning: {article.reasoning}")
-    
-    return {
-        "total": total,
-        "ranked": len(ranked_articles),
-        "articles": [
-            {
-                "digest_id": a.digest_id,
-                "rank": a.rank,
-                "relevance_score": a.relevance_score,
-                "reasoning": a.reasoning
-            }
-            for a in ranked_articles
-        ]
-    }
+    with Repository() as repo:
+        profile = load_default_profile(repo)
+        curator = CuratorAgent(profile)
+        digests = repo.get_recent_digests(hours=hours)
+        total = len(digests)
+        
+        if total == 0:
+            logger.warning(f"No digests found from the last {hours} hours")
+            return {"total": 0, "ranked": 0}
+        
+        logger.info(f"Curating {total} digests from the last {hours} hours")
+        logger.info(f"User profile: {profile['name']} - {profile['background']}")
+        
+        ranked_articles = rank_recent_digests(repo, curator, digests)
+        
+        if not ranked_articles:
+            logger.error("Failed to rank digests")
+            return {"total": total, "ranked": 0}
+        
+        logger.info(f"Successfully ranked {len(ranked_articles)} articles")
+        logger.info("\n=== Top 10 Ranked Articles ===")
+        
+        for article in ranked_articles[:10]:
+            digest = next((d for d in digests if d["id"] == article.digest_id), None)
+            if digest:
+                logger.info(f"\nRank {article.rank} | Score: {article.relevance_score:.1f}/10.0")
+                logger.info(f"Title: {digest['title']}")
+                logger.info(f"Type: {digest['article_type']}")
+                logger.info(f"Reasoning: {article.reasoning}")
+        
+        return {
+            "total": total,
+            "ranked": len(ranked_articles),
+            "articles": [
+                {
+                    "digest_id": a.digest_id,
+                    "rank": a.rank,
+                    "relevance_score": a.relevance_score,
+                    "reasoning": a.reasoning
+                }
+                for a in ranked_articles
+            ]
+        }
 
 
 if __name__ == "__main__":
@@ -1,12 +1,18 @@
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+import asyncio
 import logging
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from app.agent.digest_agent import DigestAgent
-from app.database.repository import Repository
+from app.config import DIGEST_CONCURRENCY, DIGEST_MODE, DIGEST_BATCH_MAX_REQUESTS, DEDUP_ENABLED
+from app.agent.digest_agent import DigestAgent, DigestOutput, BATCH_TERMINAL_STATUSES
+from app.agent.llm import TokenBudgetExceeded, get_scheduler
+from app.agent.llm_cache import LLMCache
+from app.database.repository import Repository, STREAM_PAGE_SIZE
+from app.dedup import Deduplicator
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,61 +22,235 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def process_digests(limit: Optional[int] = None) -> dict:
-    agent = DigestAgent()
-    repo = Repository()
-    
-    articles = repo.get_articles_without_digest(limit=limit)
-    total = len(articles)
-    processed = 0
-    failed = 0
-    
-    logger.info(f"Starting digest processing for {total} articles")
-    
+def _save_digest(repo: Repository, article: dict, digest_result: Optional[DigestOutput]) -> bool:
+    article_type = article["type"]
+    article_id = article["id"]
+    if not digest_result:
+        logger.warning(f"✗ Failed to generate digest for {article_type} {article_id}")
+        return False
+    try:
+        repo.create_digest(
+            article_type=article_type,
+            article_id=article_id,
+            url=article["url"],
+            title=digest_result.title,
+            summary=digest_result.summary,
+            published_at=article.get("published_at")
+        )
+    except Exception as e:
+        repo.session.rollback()
+        logger.error(f"✗ Error processing {article_type} {article_id}: {e}")
+        return False
+    logger.info(f"✓ Successfully created digest for {article_type} {article_id}")
+    return True
+
+
+def _log_start(idx: int, article: dict) -> None:
+    article_title = article["title"][:60] + "..." if len(article["title"]) > 60 else article["title"]
+    logger.info(f"[{idx}] Processing {article['type']}: {article_title} (ID: {article['id']})")
+
+
+def _budget_exhausted(agent: DigestAgent) -> bool:
+    if agent.llm.budget_exhausted("digest"):
+        logger.warning("LLM token budget for digests is exhausted; leaving the remaining articles for the next run")
+        return True
+    return False
+
+
+def _log_budget_skip(article: dict, error: TokenBudgetExceeded) -> None:
+    logger.warning(f"- Skipped {article['type']} {article['id']}: {error}")
+
+
+def _process_serial(repo: Repository, agent: DigestAgent, articles: Iterable[dict]) -> dict:
+    total = processed = skipped = 0
     for idx, article in enumerate(articles, 1):
-        article_type = article["type"]
-        article_id = article["id"]
-        article_title = article["title"][:60] + "..." if len(article["title"]) > 60 else article["title"]
-        
-        logger.info(f"[{idx}/{total}] Processing {article_type}: {article_title} (ID: {article_id})")
-        
+        if _budget_exhausted(agent):
+            break
+        total = idx
+        _log_start(idx, article)
         try:
             digest_result = agent.generate_digest(
                 title=article["title"],
                 content=article["content"],
-                article_type=article_type
+                article_type=article["type"]
             )
-            
-            if digest_result:
-                repo.create_digest(
-                    article_type=article_type,
-                    article_id=article_id,
-                    url=article["url"],
-                    title=digest_result.title,
-                    summary=digest_result.summary,
-                    published_at=article.get("published_at")
-                )
-                processed += 1
-                logger.info(f"✓ Successfully created digest for {article_type} {article_id}")
-            else:
-                failed += 1
-                logger.warning(f"✗ Failed to generate digest for {article_type} {article_id}")
+        except TokenBudgetExceeded as e:
+            _log_budget_skip(article, e)
+            skipped += 1
+            continue
+        except Exception as e:
+            logger.error(f"✗ Error processing {article['type']} {article['id']}: {e}")
+            continue
+        processed += _save_digest(repo, article, digest_result)
+    return {"total": total, "processed": processed, "skipped": skipped}
+
+
+async def _process_concurrent(repo: Repository, agent: DigestAgent, articles: Iterable[dict], concurrency: int) -> dict:
+    total = processed = skipped = 0
+    in_flight = set()
+    
+    async def generate(article: dict):
+        try:
+            return article, await agent.agenerate_digest(
+                title=article["title"],
+                content=article["content"],
+                article_type=article["type"]
+            )
+        except TokenBudgetExceeded as e:
+            _log_budget_skip(article, e)
+            return article, e
         except Exception as e:
-            failed += 1
-            logger.error(f"✗ Error processing {article_type} {article_id}: {e}")
+            logger.error(f"✗ Error processing {article['type']} {article['id']}: {e}")
+            return article, None
     
-    logger.info(f"Processing complete: {processed} processed, {failed} failed out of {total} total")
+    async def drain(return_when) -> None:
+        nonlocal in_flight, processed, skipped
+        done, in_flight = await asyncio.wait(in_flight, return_when=return_when)
+        for task in done:
+            article, result = task.result()
+            if isinstance(result, TokenBudgetExceeded):
+                skipped += 1
+            else:
+                processed += _save_digest(repo, article, result)
+    
+    for idx, article in enumerate(articles, 1):
+        if _budget_exhausted(agent):
+            break
+        total = idx
+        _log_start(idx, article)
+        in_flight.add(asyncio.create_task(generate(article)))
+        if len(in_flight) >= concurrency:
+            await drain(asyncio.FIRST_COMPLETED)
+    if in_flight:
+        await drain(asyncio.ALL_COMPLETED)
+    
+    return {"total": total, "processed": processed, "skipped": skipped}
+
+
+def collect_digest_batches(repo: Repository, agent: DigestAgent) -> dict:
+    requested = processed = pending = 0
+    for batch in repo.get_pending_digest_batches():
+        batch_id = batch.id
+        request_count = batch.request_count
+        remote = agent.retrieve_batch(batch_id)
+        if remote.status not in BATCH_TERMINAL_STATUSES:
+            repo.update_digest_batch(batch_id, status=remote.status)
+            pending += 1
+            logger.info(f"Digest batch {batch_id} is {remote.status}")
+            continue
+        
+        results = agent.read_batch_output(remote.output_file_id) if remote.output_file_id else {}
+        keys = [tuple(custom_id.split(":", 1)) for custom_id in results]
+        ingested = 0
+        for i in range(0, len(keys), STREAM_PAGE_SIZE):
+            for article in repo.get_articles_by_keys(keys[i:i + STREAM_PAGE_SIZE], include_content=True):
+                digest = results[f"{article['type']}:{article['id']}"]
+                if _save_digest(repo, article, digest):
+                    agent.cache_digest(article["title"], article["content"], digest)
+                    ingested += 1
+        repo.update_digest_batch(
+            batch_id,
+            status=remote.status,
+            output_file_id=remote.output_file_id,
+            error_file_id=remote.error_file_id,
+            ingested_count=ingested,
+            completed_at=datetime.now(timezone.utc)
+        )
+        requested += request_count
+        processed += ingested
+        logger.info(f"Digest batch {batch_id} {remote.status}: ingested {ingested}/{request_count}")
+    return {"total": requested, "processed": processed, "pending_batches": pending}
+
+
+def submit_digest_batch(repo: Repository, agent: DigestAgent, articles: Iterable[dict]) -> dict:
+    counts = {"submitted": 0, "cached": 0}
+    if repo.get_pending_digest_batches():
+        logger.info("A digest batch is still pending; not submitting a new one")
+        return counts
+    
+    def uncached(articles):
+        for article in articles:
+            cached = agent.get_cached_digest(article["title"], article["content"])
+            if cached:
+                counts["cached"] += _save_digest(repo, article, cached)
+            else:
+                yield article
     
+    batch, count = agent.submit_batch(uncached(articles))
+    if batch is not None:
+        repo.create_digest_batch(batch.id, batch.status, batch.input_file_id, count)
+        counts["submitted"] = count
+        logger.info(f"Submitted digest batch {batch.id} with {count} requests")
+    return counts
+
+
+def _process_batch(repo: Repository, agent: DigestAgent, articles: Iterable[dict]) -> dict:
+    collected = collect_digest_batches(repo, agent)
+    submitted = submit_digest_batch(repo, agent, articles)
     return {
-        "total": total,
-        "processed": processed,
-        "failed": failed
+        "total": collected["total"] + submitted["cached"],
+        "processed": collected["processed"] + submitted["cached"],
+        "pending_batches": collected["pending_batches"] + (1 if submitted["submitted"] else 0),
+        "submitted": submitted["submitted"]
     }
 
 
+def process_digests(limit: Optional[int] = None, concurrency: int = DIGEST_CONCURRENCY,
+                    mode: str = DIGEST_MODE) -> dict:
+    with Repository() as repo:
+        cache = LLMCache(repo)
+        agent = DigestAgent(cache=cache)
+        deduplicator = Deduplicator(repo) if DEDUP_ENABLED else None
+        
+        if mode == "batch":
+            limit = min(limit, DIGEST_BATCH_MAX_REQUESTS) if limit else DIGEST_BATCH_MAX_REQUESTS
+        articles = repo.iter_articles_without_digest(limit=limit)
+        if deduplicator:
+            articles = deduplicator.filter(articles)
+        
+        if mode == "batch":
+            logger.info("Starting digest processing (batch mode)")
+            result = _process_batch(repo, agent, articles)
+            result["failed"] = result["total"] - result["processed"]
+            result["duplicates"] = deduplicator.link() if deduplicator else 0
+            result["cache"] = cache.stats()
+            cache.evict()
+            get_scheduler().telemetry.flush(repo)
+            logger.info(f"Batch processing: ingested {result['processed']} digests, "
+                        f"submitted {result['submitted']}, {result['pending_batches']} batches pending")
+            return result
+        
+        logger.info(f"Starting digest processing (concurrency {concurrency})")
+        
+        if concurrency > 1:
+            counts = asyncio.run(_process_concurrent(repo, agent, articles, concurrency))
+        else:
+            counts = _process_serial(repo, agent, articles)
+        
+        total = counts["total"]
+        processed = counts["processed"]
+        skipped = counts["skipped"]
+        failed = total - processed - skipped
+        duplicates = deduplicator.link() if deduplicator else 0
+        logger.info(f"Processing complete: {processed} processed, {failed} failed, {skipped} skipped by the token budget "
+                    f"out of {total} total, {duplicates} near-duplicates linked")
+        logger.info(f"Digest cache: {cache.hits} hits, {cache.misses} misses")
+        cache.evict()
+        get_scheduler().telemetry.flush(repo)
+        
+        return {
+            "total": total,
+            "processed": processed,
+            "failed": failed,
+            "skipped": skipped,
+            "duplicates": duplicates,
+            "cache": cache.stats()
+        }
+
+
 if __name__ == "__main__":
-    result = process_digests()
+    result = process_digests(mode=sys.argv[1] if len(sys.argv) > 1 else DIGEST_MODE)
     print(f"Total articles: {result['total']}")
     print(f"Processed: {result['processed']}")
     print(f"Failed: {result['failed']}")
-
+    print(f"Skipped: {result.get('skipped', 0)}")
@@ -1,13 +1,15 @@
 import logging
+from typing import List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from app.agent.email_agent import EmailAgent, RankedArticleDetail, EmailDigestResponse
-from app.agent.curator_agent import CuratorAgent
-from app.profiles.user_profile import USER_PROFILE
+from app.agent.curator_agent import CuratorAgent, RankedArticle
+from app.agent.llm import get_scheduler
 from app.database.repository import Repository
 from app.services.email import send_email, digest_to_html
+from app.services.process_curator import load_default_profile, rank_recent_digests
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,75 +19,83 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def generate_email_digest(hours: int = 24, top_n: int = 10) -> EmailDigestResponse:
-    curator = CuratorAgent(USER_PROFILE)
-    email_agent = EmailAgent(USER_PROFILE)
-    repo = Repository()
-    
-    digests = repo.get_recent_digests(hours=hours)
-    total = len(digests)
-    
-    if total == 0:
-        logger.warning(f"No digests found from the last {hours} hours")
-        raise ValueError("No digests available")
-    
-    logger.info(f"Ranking {total} digests for email generation")
-    ranked_articles = curator.rank_digests(digests)
-    
-    if not ranked_articles:
-        logger.error("Failed to rank digests")
-        raise ValueError("Failed to rank articles")
-    
-    logger.info(f"Generating email digest with top {top_n} articles")
-    
+def build_email_digest(email_agent: EmailAgent, digests: List[dict], ranked_articles: List[RankedArticle],
+                       top_n: int) -> EmailDigestResponse:
+    by_id = {d["id"]: d for d in digests}
     article_details = [
         RankedArticleDetail(
             digest_id=a.digest_id,
             rank=a.rank,
             relevance_score=a.relevance_score,
             reasoning=a.reasoning,
-            title=next((d["title"] for d in digests if d["id"] == a.digest_id), ""),
-            summary=next((d["summary"] for d in digests if d["id"] == a.digest_id), ""),
-            url=next((d["url"] for d in digests if d["id"] == a.digest_id), ""),
-            article_type=next((d["article_type"] for d in digests if d["id"] == a.digest_id), "")
+            title=by_id.get(a.digest_id, {}).get("title", ""),
+            summary=by_id.get(a.digest_id, {}).get("summary", ""),
+            url=by_id.get(a.digest_id, {}).get("url", ""),
+            article_type=by_id.get(a.digest_id, {}).get("article_type", "")
         )
         for a in ranked_articles
     ]
-    
-    email_digest = email_agent.create_email_digest_response(
+    return email_agent.create_email_digest_response(
         ranked_articles=article_details,
         total_ranked=len(ranked_articles),
         limit=top_n
     )
-    
-    logger.info("Email digest generated successfully")
-    logger.info(f"\n=== Email Introduction ===")
-    logger.info(email_digest.introduction.greeting)
-    logger.info(f"\n{email_digest.introduction.introduction}")
-    
-    return email_digest
 
 
-def send_digest_email(hours: int = 24, top_n: int = 10) -> dict:
-    try:
-        result = generate_email_digest(hours=hours, top_n=top_n)
-        markdown_content = result.to_markdown()
-        html_content = digest_to_html(result)
+def email_message(email_digest: EmailDigestResponse, recipients: Optional[list] = None) -> dict:
+    greeting = email_digest.introduction.greeting
+    return {
+        "subject": f"Daily AI News Digest - {greeting.split('for ')[-1] if 'for ' in greeting else 'Today'}",
+        "body_text": email_digest.to_markdown(),
+        "body_html": digest_to_html(email_digest),
+        "recipients": recipients
+    }
+
+
+def deliver_email_digest(email_digest: EmailDigestResponse, sender=None, recipients: Optional[list] = None) -> dict:
+    message = email_message(email_digest, recipients)
+    (sender or send_email)(**message)
+    return {"subject": message["subject"], "articles_count": len(email_digest.articles)}
+
+
+def generate_email_digest(hours: int = 24, top_n: int = 10) -> EmailDigestResponse:
+    with Repository() as repo:
+        profile = load_default_profile(repo)
+        curator = CuratorAgent(profile)
+        email_agent = EmailAgent(profile)
+        digests = repo.get_recent_digests(hours=hours)
+        total = len(digests)
         
-        subject = f"Daily AI News Digest - {result.introduction.greeting.split('for ')[-1] if 'for ' in result.introduction.greeting else 'Today'}"
+        if total == 0:
+            logger.warning(f"No digests found from the last {hours} hours")
+            raise ValueError("No digests available")
         
-        send_email(
-            subject=subject,
-            body_text=markdown_content,
-            body_html=html_content
-        )
+        logger.info(f"Ranking {total} digests for email generation")
+        ranked_articles = rank_recent_digests(repo, curator, digests)
+        
+        if not ranked_articles:
+            logger.error("Failed to rank digests")
+            raise ValueError("Failed to rank articles")
+        
+        logger.info(f"Generating email digest with top {top_n} articles")
+        email_digest = build_email_digest(email_agent, digests, ranked_articles, top_n)
+        
+        logger.info("Email digest generated successfully")
+        logger.info(f"\n=== Email Introduction ===")
+        logger.info(email_digest.introduction.greeting)
+        logger.info(f"\n{email_digest.introduction.introduction}")
+        get_scheduler().telemetry.flush(repo)
+        
+        return email_digest
+
+
+def send_digest_email(hours: int = 24, top_n: int = 10, sender=None) -> dict:
+    try:
+        result = generate_email_digest(hours=hours, top_n=top_n)
+        delivered = deliver_email_digest(result, sender)
         
         logger.info("Email sent successfully!")
-        return {
-            "success": True,
-            "subject": subject,
-            "articles_count": len(result.articles)
-        }
+        return {"success": True, **delivered}
     except ValueError as e:
         logger.error(f"Error sending email: {e}")
         return {
@@ -0,0 +1,150 @@
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.agent.curator_agent import CuratorAgent, RankedArticle
+from app.agent.email_agent import EmailAgent, EmailDigestResponse
+from app.agent.embeddings import prefilter_digests_per_profile
+from app.agent.llm import get_scheduler
+from app.config import CURATOR_PREFILTER_TOP_K, PROFILE_CONCURRENCY
+from app.database.repository import Repository
+from app.services.email import get_smtp_pool, send_many
+from app.services.process_curator import DEFAULT_PROFILE_ID, load_profiles
+from app.services.process_email import build_email_digest, email_message
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+
+def deliverable_profiles(profiles: List[dict]) -> List[dict]:
+    deliverable = []
+    for profile in profiles:
+        if profile.get("email") or profile["id"] == DEFAULT_PROFILE_ID:
+            deliverable.append(profile)
+        else:
+            logger.warning(f"Skipping profile {profile['id']}: it has no email address")
+    return deliverable
+
+
+def shortlist_candidates(repo: Repository, digests: List[dict], profiles: List[dict],
+                         k: int = CURATOR_PREFILTER_TOP_K) -> List[List[dict]]:
+    try:
+        return prefilter_digests_per_profile(repo, digests, profiles, k)
+    except Exception as e:
+        repo.session.rollback()
+        logger.error(f"Error prefiltering digests, ranking all of them for every profile: {e}")
+        return [digests for _ in profiles]
+
+
+def _rank_group(curator: CuratorAgent, candidates: List[dict]) -> Tuple[List[RankedArticle], Dict[str, int]]:
+    with Repository() as repo:
+        return curator.rank_digests_incremental(repo, candidates)
+
+
+def rank_profiles(repo: Repository, digests: List[dict], profiles: List[dict]) -> List[List[RankedArticle]]:
+    shortlists = shortlist_candidates(repo, digests, profiles)
+    groups: Dict[Tuple[str, Tuple[str, ...]], Tuple[CuratorAgent, List[dict]]] = {}
+    keys = []
+    for profile, candidates in zip(profiles, shortlists):
+        curator = CuratorAgent(profile)
+        key = (curator.profile_version, tuple(sorted(d["id"] for d in candidates)))
+        groups.setdefault(key, (curator, candidates))
+        keys.append(key)
+    logger.info(f"Ranking {len(groups)} distinct shortlists for {len(profiles)} profiles")
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(PROFILE_CONCURRENCY, len(groups)))) as executor:
+        ranked = dict(zip(groups, executor.map(lambda group: _rank_group(*group), groups.values())))
+    stored = sum(counts["stored"] for _, counts in ranked.values())
+    scored = sum(counts["scored"] for _, counts in ranked.values())
+    logger.info(f"Curator scores: {stored} stored, {scored} scored this run")
+    return [ranked[key][0] for key in keys]
+
+
+def _compose_profile_digest(profile: dict, digests: List[dict], ranked_articles: List[RankedArticle],
+                            top_n: int) -> Tuple[dict, Optional[EmailDigestResponse], Optional[str]]:
+    if not ranked_articles:
+        return profile, None, "Failed to rank articles"
+    try:
+        return profile, build_email_digest(EmailAgent(profile), digests, ranked_articles, top_n), None
+    except Exception as e:
+        logger.error(f"Error composing digest for profile {profile['id']}: {e}")
+        return profile, None, str(e)
+
+
+def send_profile_digests(hours: int = 24, top_n: int = 10, sender=None) -> dict:
+    with Repository() as repo:
+        active = load_profiles(repo)
+        profiles = deliverable_profiles(active)
+        digests = repo.get_recent_digests(hours=hours)
+        
+        if not profiles:
+            logger.warning("No active profiles with an email address")
+            return {"success": False, "error": "No active profiles with an email address"}
+        if not digests:
+            logger.warning(f"No digests found from the last {hours} hours")
+            return {"success": False, "error": "No digests available"}
+        
+        logger.info(f"Ranking {len(digests)} digests for {len(profiles)} profiles")
+        rankings = rank_profiles(repo, digests, profiles)
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(PROFILE_CONCURRENCY, len(profiles)))) as executor:
+            composed = list(executor.map(
+                lambda item: _compose_profile_digest(item[0], digests, item[1], top_n),
+                zip(profiles, rankings)
+            ))
+        get_scheduler().telemetry.flush(repo)
+        pruned = repo.prune_curator_scores(hours, list({CuratorAgent(profile).profile_version for profile in profiles}))
+        if pruned:
+            logger.info(f"Pruned {pruned} curator scores outside the last {hours} hours or for old profile versions")
+    
+    ready = [(profile, email_digest) for profile, email_digest, _ in composed if email_digest is not None]
+    try:
+        errors = send_many([
+            email_message(email_digest, [profile["email"]] if profile.get("email") else None)
+            for profile, email_digest in ready
+        ], sender)
+    finally:
+        if sender is None:
+            get_smtp_pool().close()
+    
+    failures = {profile["id"]: error for profile, _, error in composed if error}
+    deliveries = []
+    for (profile, email_digest), error in zip(ready, errors):
+        if error is None:
+            deliveries.append({"profile_id": profile["id"], "success": True, "articles_count": len(email_digest.articles)})
+        else:
+            logger.error(f"Error sending digest to profile {profile['id']}: {error}")
+            failures[profile["id"]] = str(error)
+    deliveries.extend({"profile_id": profile_id, "success": False, "error": error} for profile_id, error in failures.items())
+    
+    sent = [d for d in deliveries if d["success"]]
+    logger.info(f"Sent {len(sent)} of {len(profiles)} profile digests")
+    return {
+        "success": len(sent) > 0,
+        "profiles": len(profiles),
+        "sent": len(sent),
+        "failed": len(profiles) - len(sent),
+        "skipped": len(active) - len(profiles),
+        "articles_count": sum(d["articles_count"] for d in sent),
+        "deliveries": deliveries,
+        **({} if sent else {"error": next(iter(failures.values()), "Unknown error")})
+    }
+
+
+if __name__ == "__main__":
+    result = send_profile_digests(hours=24, top_n=10)
+    print(f"\n=== Profile Digests ===")
+    print(f"Sent: {result.get('sent', 0)}/{result.get('profiles', 0)}")
+    if not result["success"]:
+        print(f"Error: {result['error']}")
@@ -1,46 +1,71 @@
 from typing import Optional
 
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from app.config import (
+    TRANSCRIPT_WORKERS, TRANSCRIPT_RATE_PER_SECOND, TRANSCRIPT_BURST, TRANSCRIPT_BATCH_SIZE, WRITE_FLUSH_INTERVAL
+)
+from app.rate_limit import get_bucket
 from app.scrapers.youtube import YouTubeScraper
 from app.database.repository import Repository
 
 
 TRANSCRIPT_UNAVAILABLE_MARKER = "__UNAVAILABLE__"
 
+_local = threading.local()
 
-def process_youtube_transcripts(limit: Optional[int] = None) -> dict:
-    scraper = YouTubeScraper()
-    repo = Repository()
-    
-    videos = repo.get_youtube_videos_without_transcript(limit=limit)
-    processed = 0
-    unavailable = 0
-    failed = 0
-    
-    for video in videos:
-        try:
-            transcript_result = scraper.get_transcript(video.video_id)
-            if transcript_result:
-                repo.update_youtube_video_transcript(video.video_id, transcript_result.text)
-                processed += 1
-            else:
-                repo.update_youtube_video_transcript(video.video_id, TRANSCRIPT_UNAVAILABLE_MARKER)
-                unavailable += 1
-        except Exception as e:
-            repo.update_youtube_video_transcript(video.video_id, TRANSCRIPT_UNAVAILABLE_MARKER)
-            unavailable += 1
-            print(f"Error processing video {video.video_id}: {e}")
-    
-    return {
-        "total": len(videos),
-        "processed": processed,
-        "unavailable": unavailable,
-        "failed": failed
-    }
+
+def _thread_scraper(transcript_api=None) -> YouTubeScraper:
+    scraper = getattr(_local, "scraper", None)
+    if scraper is None or getattr(_local, "transcript_api", None) is not transcript_api:
+        scraper = YouTubeScraper(transcript_api=transcript_api)
+        _local.scraper = scraper
+        _local.transcript_api = transcript_api
+    return scraper
+
+
+def _fetch_transcript(video_id: str, transcript_api=None) -> Optional[str]:
+    scraper = _thread_scraper(transcript_api)
+    get_bucket(f"transcripts:{scraper.egress}", TRANSCRIPT_RATE_PER_SECOND, TRANSCRIPT_BURST).acquire()
+    transcript = scraper.get_transcript(video_id)
+    return transcript.text if transcript else None
+
+
+def process_youtube_transcripts(limit: Optional[int] = None, workers: int = TRANSCRIPT_WORKERS,
+                                batch_size: int = TRANSCRIPT_BATCH_SIZE, transcript_api=None) -> dict:
+    with Repository() as repo:
+        video_ids = [video.video_id for video in repo.iter_youtube_videos_without_transcript(limit=limit)]
+        processed = 0
+        unavailable = 0
+        
+        with repo.transcript_writer(batch_size, WRITE_FLUSH_INTERVAL) as writer, \
+                ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(_fetch_transcript, video_id, transcript_api): video_id for video_id in video_ids}
+            for future in as_completed(futures):
+                video_id = futures[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    text = None
+                    print(f"Error processing video {video_id}: {e}")
+                if text:
+                    writer.add(video_id, text)
+                    processed += 1
+                else:
+                    writer.add(video_id, TRANSCRIPT_UNAVAILABLE_MARKER)
+                    unavailable += 1
+        
+        return {
+            "total": len(video_ids),
+            "processed": processed,
+            "unavailable": unavailable,
+            "failed": len(writer.failed)
+        }
 
 
 if __name__ == "__main__":
@@ -49,4 +74,3 @@ if __name__ == "__main__":
     print(f"Processed: {result['processed']}")
     print(f"Unavailable: {result['unavailable']}")
     print(f"Failed: {result['failed']}")
-
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+OFFLINE_ENV = {
+    "LLM_RPM": "1000000",
+    "LLM_TPM": "1000000000",
+    "TRANSCRIPT_RATE_PER_SECOND": "1000000",
+    "TRANSCRIPT_BURST": "1000000",
+    "TOKENIZER_ENCODING": "approximate"
+}
+
+STAGE_ITEMS = {
+    "scraping": lambda r: sum(v for k, v in r["scraping"].items() if k != "unchanged_feeds"),
+    "anthropic": lambda r: r["processing"].get("anthropic", {}).get("total", 0),
+    "youtube": lambda r: r["processing"].get("youtube", {}).get("total", 0),
+    "digests": lambda r: r["digests"].get("total", 0),
+    "email": lambda r: r["email"].get("articles_count", 0)
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run run_daily_pipeline end to end against synthetic or recorded fixtures.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="synthetic workload sizes (items across all sources)")
+    parser.add_argument("--database", default="ai_news_benchmark",
+                        help="Postgres database to run against; its name must contain 'benchmark' because "
+                             "every table in it is dropped before each workload")
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated mean LLM call latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="standard deviation of simulated LLM latency")
+    parser.add_argument("--source-latency-ms", type=float, default=0.0,
+                        help="simulated latency of feed, transcript, markdown and email calls")
+    parser.add_argument("--profiles", type=int, default=0,
+                        help="seed this many synthetic subscriber profiles instead of the default USER_PROFILE")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster, no peak memory)")
+    parser.add_argument("--record", metavar="DIR", help="run the live pipeline once and record fixtures into DIR")
+    parser.add_argument("--replay", metavar="DIR", help="replay fixtures recorded with --record instead of synthetic data")
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def is_benchmark_database(name: str) -> bool:
+    return "benchmark" in (name or "").lower()
+
+
+def reset_database() -> None:
+    from sqlalchemy import text
+    from app.database.connection import engine
+    from app.database.migrations import migrate
+    from app.database.models import Base
+    
+    if not is_benchmark_database(engine.url.database):
+        raise SystemExit(f"Refusing to drop tables in {engine.url.database!r}: "
+                         f"the benchmark database name must contain 'benchmark'")
+    Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS schema_migrations"))
+    Base.metadata.create_all(engine)
+    migrate(engine)
+
+
+def summarize(label: str, result: dict, seconds: float, emails: int) -> dict:
+    stages = {}
+    for stage, elapsed in result["timings"].items():
+        items = STAGE_ITEMS[stage](result) if stage in STAGE_ITEMS else 0
+        stages[stage] = {
+            "seconds": elapsed,
+            "items": items,
+            "items_per_second": round(items / elapsed, 1) if elapsed > 0 else None,
+            "peak_mb": result.get("memory_peak_mb", {}).get(stage)
+        }
+    llm = result.get("llm", {})
+    return {
+        "workload": label,
+        "success": result["success"],
+        "seconds": round(seconds, 3),
+        "emails": emails,
+        "stages": stages,
+        "llm": {k: llm.get(k) for k in ("calls", "failed", "retries", "input_tokens", "output_tokens", "p50_ms", "p95_ms")}
+    }
+
+
+def run_workload(args: argparse.Namespace, label: str, fetcher, transcript_api, converter, backend) -> dict:
+    from app.agent.llm import get_scheduler
+    from app.daily_runner import run_daily_pipeline
+    from app.replay.llm import AsyncReplayOpenAI, ReplayOpenAI
+    from app.replay.sources import CapturingSender
+    from app.replay.store import LatencyModel
+    
+    reset_database()
+    if args.profiles:
+        from app.database.repository import Repository
+        from app.replay.corpus import synthetic_profiles
+        
+        with Repository() as repo:
+            repo.save_profiles(synthetic_profiles(args.profiles, args.seed))
+    latency = LatencyModel(args.latency_ms, args.jitter_ms, args.seed)
+    get_scheduler().install_clients(ReplayOpenAI(backend, latency), AsyncReplayOpenAI(backend, latency))
+    sender = CapturingSender(LatencyModel(args.source_latency_ms))
+    
+    if not args.no_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = run_daily_pipeline(hours=args.hours, top_n=10, fetcher=fetcher, transcript_api=transcript_api,
+                                    converter=converter, email_sender=sender)
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    return summarize(label, result, time.perf_counter() - start, len(sender.messages))
+
+
+def record(args: argparse.Namespace) -> dict:
+    from openai import AsyncOpenAI, OpenAI
+    from app.agent.llm import get_scheduler
+    from app.daily_runner import run_daily_pipeline
+    from app.replay.llm import AsyncRecordingOpenAI, RecordingOpenAI
+    from app.replay.sources import CapturingSender, RecordingConverter, RecordingFeedFetcher, RecordingTranscriptApi
+    from app.replay.store import FixtureStore
+    from app.scrapers.anthropic import get_converter
+    from app.scrapers.youtube import YouTubeScraper
+    
+    store = FixtureStore(args.record)
+    reset_database()
+    get_scheduler().install_clients(
+        RecordingOpenAI(OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0), store),
+        AsyncRecordingOpenAI(AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0), store)
+    )
+    sender = CapturingSender()
+    start = time.perf_counter()
+    result = run_daily_pipeline(
+        hours=args.hours,
+        top_n=10,
+        fetcher=RecordingFeedFetcher(store),
+        transcript_api=RecordingTranscriptApi(YouTubeScraper().transcript_api, store),
+        converter=RecordingConverter(get_converter(), store),
+        email_sender=sender
+    )
+    return summarize(f"record:{args.record}", result, time.perf_counter() - start, len(sender.messages))
+
+
+def print_report(reports: List[dict]) -> None:
+    print(f"\n{'workload':<20} {'stage':<10} {'items':>8} {'seconds':>9} {'items/s':>10} {'peak MB':>8}")
+    for report in reports:
+        for stage, stats in report["stages"].items():
+            rate = stats["items_per_second"]
+            peak = stats["peak_mb"]
+            print(f"{report['workload']:<20} {stage:<10} {stats['items']:>8} {stats['seconds']:>9.2f} "
+                  f"{rate if rate is not None else '-':>10} {peak if peak is not None else '-':>8}")
+        llm = report["llm"]
+        print(f"{report['workload']:<20} {'total':<10} {'':>8} {report['seconds']:>9.2f}   "
+              f"llm calls {llm['calls']} (p50 {llm['p50_ms']}ms, p95 {llm['p95_ms']}ms), "
+              f"success={report['success']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if not is_benchmark_database(args.database):
+        print(f"Refusing to run against {args.database!r}: every table is dropped before each workload, "
+              f"so the database name must contain 'benchmark'")
+        return 2
+    os.environ["POSTGRES_DB"] = args.database
+    if not args.record:
+        os.environ["DIGEST_MODE"] = "realtime"
+        for key, value in OFFLINE_ENV.items():
+            os.environ.setdefault(key, value)
+    
+    print(f"Using database {args.database}; all of its tables are dropped before each workload")
+    if args.record:
+        reports = [record(args)]
+    else:
+        from app.replay.corpus import SyntheticCorpus
+        from app.replay.llm import ReplayBackend, SyntheticResponder
+        from app.replay.sources import ReplayConverter, ReplayFeedFetcher, ReplayTranscriptApi
+        from app.replay.store import FixtureStore, LatencyModel
+        
+        source_latency = LatencyModel(args.source_latency_ms)
+        reports = []
+        if args.replay:
+            store = FixtureStore(args.replay)
+            backend = ReplayBackend(store=store, responder=SyntheticResponder())
+            reports.append(run_workload(
+                args, f"replay:{Path(args.replay).name}",
+                ReplayFeedFetcher.from_store(store, source_latency),
+                ReplayTranscriptApi.from_store(store, source_latency),
+                ReplayConverter.from_store(store, source_latency),
+                backend
+            ))
+        else:
+            backend = ReplayBackend(responder=SyntheticResponder())
+            for size in args.sizes:
+                corpus = SyntheticCorpus(size, seed=args.seed, hours=args.hours)
+                reports.append(run_workload(
+                    args, f"synthetic-{size}",
+                    ReplayFeedFetcher(corpus.feeds, source_latency),
+                    ReplayTranscriptApi(corpus.transcripts, source_latency),
+                    ReplayConverter(corpus.markdowns, source_latency),
+                    backend
+                ))
+    
+    print_report(reports)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    return 0 if all(report["success"] for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import os
+import threading
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+
+TEST_DATABASE = os.getenv("TEST_POSTGRES_DB", "ai_news_test")
+
+
+@pytest.fixture(scope="session")
+def pg_engine():
+    from app.database.connection import get_database_url
+    
+    url = make_url(get_database_url())
+    try:
+        admin = create_engine(url, isolation_level="AUTOCOMMIT")
+        with admin.connect() as conn:
+            exists = conn.execute(text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": TEST_DATABASE}).first()
+            if not exists:
+                conn.execute(text(f'CREATE DATABASE "{TEST_DATABASE}"'))
+        admin.dispose()
+    except OperationalError as e:
+        pytest.skip(f"Postgres is not available: {e}")
+    
+    engine = create_engine(url.set(database=TEST_DATABASE))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def pg_repo(pg_engine):
+    from sqlalchemy.orm import Session
+    from app.database.migrations import migrate
+    from app.database.models import Base
+    from app.database.repository import Repository
+    
+    Base.metadata.create_all(pg_engine)
+    migrate(pg_engine)
+    with pg_engine.begin() as conn:
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        conn.execute(text(f"TRUNCATE {tables}"))
+    with Repository(Session(bind=pg_engine)) as repo:
+        yield repo
+        repo.session.close()
+
+
+@pytest.fixture
+def replay_llm(monkeypatch):
+    from app.agent import embeddings, llm
+    from app.replay.llm import AsyncReplayOpenAI, ReplayBackend, ReplayOpenAI, SyntheticResponder
+    
+    class CountingResponder(SyntheticResponder):
+        def __init__(self):
+            super().__init__()
+            self.calls = Counter()
+            self._lock = threading.Lock()
+        
+        def parse(self, kwargs: dict):
+            with self._lock:
+                self.calls[kwargs["text_format"].__name__] += 1
+            return super().parse(kwargs)
+    
+    responder = CountingResponder()
+    backend = ReplayBackend(responder=responder)
+    scheduler = llm.LLMScheduler(rpm=1_000_000, tpm=1_000_000_000)
+    scheduler.install_clients(ReplayOpenAI(backend), AsyncReplayOpenAI(backend))
+    monkeypatch.setattr(llm, "_scheduler", scheduler)
+    monkeypatch.setattr(embeddings, "_prefilters", {})
+    return responder
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.agent import curator_agent
+from app.agent.curator_agent import CuratorAgent
+
+READER = {
+    "name": "Reader",
+    "background": "Builds retrieval systems",
+    "interests": ["Retrieval-Augmented Generation"],
+    "preferences": {"prefer_practical": True},
+    "expertise_level": "Advanced"
+}
+
+
+@pytest.fixture
+def digests(pg_repo):
+    for i in range(5):
+        pg_repo.create_digest("youtube", f"v{i}", f"https://example.com/{i}", f"Release {i}", f"Summary of release {i}.")
+    return pg_repo.get_recent_digests(hours=24)
+
+
+def test_second_run_reuses_stored_scores(pg_repo, replay_llm, digests):
+    curator = CuratorAgent(READER)
+    
+    first, first_counts = curator.rank_digests_incremental(pg_repo, digests)
+    second, second_counts = CuratorAgent(READER).rank_digests_incremental(pg_repo, digests)
+    
+    assert first_counts == {"stored": 0, "scored": 5}
+    assert second_counts == {"stored": 5, "scored": 0}
+    assert replay_llm.calls["ScoredDigestList"] == 1
+    assert [a.digest_id for a in second] == [a.digest_id for a in first]
+    assert set(pg_repo.get_curator_scores([d["id"] for d in digests], curator.profile_version)) == {d["id"] for d in digests}
+
+
+def test_profile_or_prompt_edits_force_a_rescore(pg_repo, replay_llm, digests, monkeypatch):
+    original = CuratorAgent(READER)
+    original.rank_digests_incremental(pg_repo, digests)
+    
+    edited = CuratorAgent({**READER, "background": "Runs inference clusters"})
+    assert edited.profile_version != original.profile_version
+    assert edited.rank_digests_incremental(pg_repo, digests)[1] == {"stored": 0, "scored": 5}
+    
+    monkeypatch.setattr(curator_agent, "CURATOR_PROMPT", curator_agent.CURATOR_PROMPT + "\nPrefer primary sources.")
+    reprompted = CuratorAgent(READER)
+    assert reprompted.profile_version != original.profile_version
+    assert reprompted.rank_digests_incremental(pg_repo, digests)[1] == {"stored": 0, "scored": 5}
+    assert replay_llm.calls["ScoredDigestList"] == 3
+
+
+def test_prune_drops_stale_versions_and_old_digests(pg_repo, digests):
+    pg_repo.create_digest("youtube", "old", "https://example.com/old", "Old", "Old summary.",
+                          published_at=datetime.now(timezone.utc) - timedelta(days=3))
+    score = {"relevance_score": 5.0, "reasoning": "ok"}
+    pg_repo.save_curator_scores("current", "model", [{"digest_id": "youtube:v0", **score}, {"digest_id": "youtube:old", **score}])
+    pg_repo.save_curator_scores("stale", "model", [{"digest_id": "youtube:v0", **score}])
+    
+    assert pg_repo.prune_curator_scores(24, ["current"]) == 2
+    assert set(pg_repo.get_curator_scores(["youtube:v0", "youtube:old"], "current")) == {"youtube:v0"}
+    assert pg_repo.get_curator_scores(["youtube:v0"], "stale") == {}
@@ -0,0 +1,62 @@
+import random
+
+from app.dedup import DedupIndex, Deduplicator, article_signature
+
+WORDS = [f"term{i}" for i in range(2000)]
+
+
+def _text(seed: int, length: int = 300) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def _edit(text: str, every: int) -> str:
+    words = text.split()
+    return " ".join("edited" if i % every == 0 else word for i, word in enumerate(words))
+
+
+def _article(source: str, article_id: str, content: str, title: str = "Model release") -> dict:
+    return {"type": source, "id": article_id, "title": title, "content": content, "url": f"https://example.com/{article_id}"}
+
+
+def test_near_identical_texts_across_sources_share_a_representative():
+    original = _text(1)
+    index = DedupIndex()
+    index.add("youtube:a", article_signature(_article("youtube", "a", original)))
+    
+    copy = _article("anthropic", "b", _edit(original, 50), title="Model release announced")
+    assert index.query(article_signature(copy)) == "youtube:a"
+
+
+def test_distinct_texts_do_not_collapse():
+    index = DedupIndex()
+    index.add("youtube:a", article_signature(_article("youtube", "a", _text(1))))
+    
+    assert index.query(article_signature(_article("openai", "b", _text(2)))) is None
+    shared_intro = _text(1, 60) + " " + _text(3, 240)
+    assert index.query(article_signature(_article("openai", "c", shared_intro))) is None
+    assert index.query(article_signature(_article("openai", "d", _edit(_text(1), 4)))) is None
+
+
+def test_filter_and_link_store_duplicates_outside_recent_digests(pg_repo):
+    original = _text(1)
+    articles = [
+        _article("youtube", "a", original),
+        _article("anthropic", "b", _edit(original, 50)),
+        _article("openai", "c", _text(2)),
+    ]
+    deduplicator = Deduplicator(pg_repo)
+    
+    kept = list(deduplicator.filter(articles))
+    assert [a["id"] for a in kept] == ["a", "c"]
+    
+    for article in kept:
+        pg_repo.create_digest(article["type"], article["id"], article["url"], f"Digest {article['id']}", "Summary.")
+    assert deduplicator.link() == 1
+    
+    assert {d["id"] for d in pg_repo.get_recent_digests()} == {"youtube:a", "openai:c"}
+    everything = {d["id"]: d for d in pg_repo.get_recent_digests(include_duplicates=True)}
+    assert everything["anthropic:b"]["title"] == "Digest a"
+    reloaded = Deduplicator(pg_repo).index
+    assert set(reloaded.signatures) == {"youtube:a", "openai:c"}
+    assert reloaded.query(article_signature(_article("openai", "e", _edit(original, 40)))) == "youtube:a"
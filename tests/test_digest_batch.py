@@ -0,0 +1,112 @@
+import json
+from datetime import datetime, timezone
+from itertools import count
+from types import SimpleNamespace
+
+from app.agent.digest_agent import BATCH_ENDPOINT, DigestAgent, DigestOutput
+from app.agent.llm import LLMScheduler
+from app.services.process_digest import _process_batch
+
+
+class FakeBatchClient:
+    def __init__(self):
+        self._ids = count(1)
+        self.file_contents = {}
+        self.jobs = {}
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def _create_file(self, file, purpose):
+        name, handle = file
+        file_id = f"file-{next(self._ids)}"
+        self.file_contents[file_id] = handle.read().decode("utf-8")
+        return SimpleNamespace(id=file_id, filename=name, purpose=purpose)
+
+    def _file_content(self, file_id):
+        return SimpleNamespace(text=self.file_contents[file_id])
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        assert endpoint == BATCH_ENDPOINT
+        job = SimpleNamespace(id=f"batch-{next(self._ids)}", status="validating", input_file_id=input_file_id,
+                              output_file_id=None, error_file_id=None)
+        self.jobs[job.id] = job
+        return job
+
+    def _retrieve_batch(self, batch_id):
+        return self.jobs[batch_id]
+
+    def requests(self, batch_id):
+        return [json.loads(line) for line in self.file_contents[self.jobs[batch_id].input_file_id].splitlines()]
+
+    def complete(self, batch_id, failed=()):
+        lines = []
+        for request in self.requests(batch_id):
+            custom_id = request["custom_id"]
+            if custom_id in failed:
+                response = {"status_code": 500, "body": {"error": {"message": "boom"}}}
+            else:
+                digest = {"title": f"Digest of {custom_id}", "summary": request["body"]["input"][:40]}
+                response = {"status_code": 200, "body": {"output": [
+                    {"type": "message", "content": [{"type": "output_text", "text": json.dumps(digest)}]}
+                ]}}
+            lines.append(json.dumps({"custom_id": custom_id, "response": response}))
+        output_id = f"file-{next(self._ids)}"
+        self.file_contents[output_id] = "\n".join(lines)
+        job = self.jobs[batch_id]
+        job.status = "completed"
+        job.output_file_id = output_id
+
+
+def _agent(client):
+    llm = LLMScheduler()
+    llm.install_clients(client)
+    return DigestAgent(llm=llm)
+
+
+def _article(article_id):
+    return {"type": "youtube", "id": article_id, "title": f"Video {article_id}", "content": "Transcript text " * 20,
+            "url": f"https://www.youtube.com/watch?v={article_id}"}
+
+
+def test_submit_and_read_batch_round_trip():
+    client = FakeBatchClient()
+    agent = _agent(client)
+    
+    batch, submitted = agent.submit_batch(_article(i) for i in ("a", "b", "c"))
+    assert submitted == 3
+    requests = client.requests(batch.id)
+    assert [r["custom_id"] for r in requests] == ["youtube:a", "youtube:b", "youtube:c"]
+    assert all(r["url"] == BATCH_ENDPOINT and r["body"]["text"]["format"]["strict"] for r in requests)
+    
+    client.complete(batch.id, failed={"youtube:b"})
+    results = agent.read_batch_output(agent.retrieve_batch(batch.id).output_file_id)
+    assert results["youtube:a"] == DigestOutput(title="Digest of youtube:a", summary=requests[0]["body"]["input"][:40])
+    assert results["youtube:b"] is None
+    assert results["youtube:c"].title == "Digest of youtube:c"
+
+
+def test_submit_batch_skips_empty_input():
+    client = FakeBatchClient()
+    assert _agent(client).submit_batch([]) == (None, 0)
+    assert client.jobs == {}
+
+
+def test_process_batch_submits_once_and_ingests_idempotently(pg_repo):
+    for video_id in ("v1", "v2"):
+        pg_repo.create_youtube_video(video_id, f"Video {video_id}", f"https://www.youtube.com/watch?v={video_id}",
+                                     "channel", datetime.now(timezone.utc), transcript="Transcript text " * 20)
+    client = FakeBatchClient()
+    agent = _agent(client)
+    
+    first = _process_batch(pg_repo, agent, pg_repo.iter_articles_without_digest())
+    assert first["submitted"] == 2 and first["pending_batches"] == 1
+    
+    second = _process_batch(pg_repo, agent, pg_repo.iter_articles_without_digest())
+    assert second["submitted"] == 0 and second["pending_batches"] == 1
+    assert len(client.jobs) == 1
+    
+    client.complete(next(iter(client.jobs)))
+    third = _process_batch(pg_repo, agent, pg_repo.iter_articles_without_digest())
+    assert third["processed"] == 2 and third["pending_batches"] == 0
+    assert pg_repo.get_articles_without_digest() == []
+    assert {d["title"] for d in pg_repo.get_recent_digests(hours=24)} == {"Digest of youtube:v1", "Digest of youtube:v2"}
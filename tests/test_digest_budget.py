@@ -0,0 +1,71 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.agent import tokens
+from app.agent.digest_agent import DigestAgent
+from app.agent.llm import LLMScheduler, TokenBudgetExceeded
+from app.replay.llm import AsyncReplayOpenAI, ReplayBackend, ReplayOpenAI, SyntheticResponder
+from app.services.process_digest import _process_concurrent, _process_serial
+
+ARTICLES = 30
+TOKEN_BUDGET = 10000
+
+
+def _agent() -> DigestAgent:
+    backend = ReplayBackend(responder=SyntheticResponder())
+    llm = LLMScheduler(rpm=1_000_000, tpm=1_000_000_000, token_budget=TOKEN_BUDGET, budget_reserve=0)
+    llm.install_clients(ReplayOpenAI(backend), AsyncReplayOpenAI(backend))
+    return DigestAgent(llm=llm)
+
+
+@pytest.fixture
+def pending_videos(pg_repo):
+    for i in range(ARTICLES):
+        pg_repo.create_youtube_video(f"v{i:02d}", f"Video {i}", f"https://www.youtube.com/watch?v=v{i:02d}", "channel",
+                                     datetime.now(timezone.utc), transcript=f"Model release {i}. " * 150)
+    return pg_repo
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_digest_loop_stops_when_budget_is_spent(pending_videos, concurrency):
+    repo = pending_videos
+    agent = _agent()
+    articles = repo.iter_articles_without_digest()
+    if concurrency > 1:
+        counts = asyncio.run(_process_concurrent(repo, agent, articles, concurrency))
+    else:
+        counts = _process_serial(repo, agent, articles)
+    
+    assert 0 < counts["processed"] < ARTICLES
+    assert counts["total"] == counts["processed"] + counts["skipped"]
+    assert 1 <= counts["skipped"] <= concurrency
+    assert agent.llm.budget_exhausted("digest")
+    assert agent.llm.used_tokens <= TOKEN_BUDGET
+    assert len(repo.get_articles_without_digest()) == ARTICLES - counts["processed"]
+
+
+class StoppingScheduler:
+    def __init__(self):
+        self.finished = []
+    
+    async def aparse(self, stage, **kwargs):
+        if "Section 1 of" in kwargs["input"]:
+            raise TokenBudgetExceeded("digest budget spent")
+        await asyncio.sleep(0.2)
+        self.finished.append(kwargs["input"])
+
+
+def test_budget_stop_cancels_sibling_chunks(monkeypatch):
+    monkeypatch.setattr(tokens, "_encoding", tokens.ApproximateEncoding())
+    scheduler = StoppingScheduler()
+    agent = DigestAgent(llm=scheduler)
+    
+    async def run():
+        with pytest.raises(TokenBudgetExceeded):
+            await agent.agenerate_digest("Long video", "word " * 10000, "youtube")
+        await asyncio.sleep(0.3)
+    
+    asyncio.run(run())
+    assert scheduler.finished == []
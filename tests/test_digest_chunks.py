@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.agent import tokens
+from app.agent.digest_agent import ChunkSummary, DigestAgent, DigestOutput
+from app.config import DIGEST_CHUNK_OVERLAP, DIGEST_CHUNK_TOKENS, DIGEST_MAX_CHUNKS, DIGEST_SINGLE_CALL_TOKENS
+
+
+class ScriptedScheduler:
+    def __init__(self, fail_chunks: bool = False):
+        self.fail_chunks = fail_chunks
+        self.calls = []
+    
+    def parse(self, stage, **kwargs):
+        text_format = kwargs["text_format"]
+        self.calls.append(text_format.__name__)
+        if text_format is ChunkSummary:
+            if self.fail_chunks:
+                raise RuntimeError("chunk failed")
+            return SimpleNamespace(output_parsed=ChunkSummary(summary="Section summary."))
+        return SimpleNamespace(output_parsed=DigestOutput(title="Digest", summary="Summary."))
+
+
+@pytest.fixture(autouse=True)
+def approximate_tokens(monkeypatch):
+    encoding = tokens.ApproximateEncoding()
+    monkeypatch.setattr(tokens, "_encoding", encoding)
+    return encoding
+
+
+def _content(token_count: int) -> str:
+    return "".join(f" w{i % 1000:03d}" for i in range(token_count))
+
+
+def test_short_content_is_digested_in_one_call():
+    scheduler = ScriptedScheduler()
+    agent = DigestAgent(llm=scheduler)
+    
+    assert agent._split_content(_content(DIGEST_SINGLE_CALL_TOKENS)) == [_content(DIGEST_SINGLE_CALL_TOKENS)]
+    assert agent.generate_digest("Title", _content(100), "youtube").title == "Digest"
+    assert scheduler.calls == ["DigestOutput"]
+
+
+@pytest.mark.parametrize("token_count", [DIGEST_SINGLE_CALL_TOKENS + 1, 10 * DIGEST_CHUNK_TOKENS * DIGEST_MAX_CHUNKS])
+def test_long_content_is_split_into_overlapping_chunks(approximate_tokens, token_count):
+    chunks = DigestAgent(llm=ScriptedScheduler())._split_content(_content(token_count))
+    pieces = [approximate_tokens.encode(chunk) for chunk in chunks]
+    
+    assert 1 < len(chunks) <= DIGEST_MAX_CHUNKS
+    assert all(len(piece) >= DIGEST_CHUNK_TOKENS for piece in pieces[:-1])
+    for previous, current in zip(pieces, pieces[1:]):
+        assert previous[-DIGEST_CHUNK_OVERLAP:] == current[:DIGEST_CHUNK_OVERLAP]
+    assert "".join(chunks[0:1] + [tokens.get_encoding().decode(p[DIGEST_CHUNK_OVERLAP:]) for p in pieces[1:]]) == _content(token_count)
+
+
+def test_map_reduce_summarizes_every_chunk_then_reduces():
+    scheduler = ScriptedScheduler()
+    chunks = DigestAgent(llm=scheduler)._split_content(_content(3 * DIGEST_CHUNK_TOKENS))
+    
+    assert DigestAgent(llm=scheduler).generate_digest("Title", _content(3 * DIGEST_CHUNK_TOKENS), "youtube").title == "Digest"
+    assert scheduler.calls == ["ChunkSummary"] * len(chunks) + ["DigestOutput"]
+
+
+def test_digest_is_none_when_every_chunk_fails():
+    scheduler = ScriptedScheduler(fail_chunks=True)
+    
+    assert DigestAgent(llm=scheduler).generate_digest("Title", _content(3 * DIGEST_CHUNK_TOKENS), "youtube") is None
+    assert "DigestOutput" not in scheduler.calls
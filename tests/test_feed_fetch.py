@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+from app.scrapers.fetch import FeedFetcher
+
+URL = "https://example.com/feed.xml"
+
+
+class ScriptedSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+    
+    def get(self, url, headers, timeout):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+def _response(status: int, content: bytes = b"", **headers) -> SimpleNamespace:
+    return SimpleNamespace(status_code=status, content=content, headers=headers)
+
+
+def _fetcher(*responses) -> FeedFetcher:
+    fetcher = FeedFetcher()
+    fetcher.scripted = ScriptedSession(responses)
+    fetcher._session = lambda: fetcher.scripted
+    return fetcher
+
+
+def test_unchanged_body_still_stores_rotated_validators():
+    fetcher = _fetcher(
+        _response(200, b"<rss/>", ETag='"v1"', **{"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+        _response(200, b"<rss/>", ETag='"v2"', **{"Last-Modified": "Tue, 02 Jan 2024 00:00:00 GMT"}),
+        _response(304),
+    )
+    
+    first = fetcher.fetch(URL)
+    second = fetcher.fetch(URL, first.to_state())
+    assert second.unchanged and not second.ok and second.has_state
+    assert second.to_state()["etag"] == '"v2"'
+    
+    third = fetcher.fetch(URL, second.to_state())
+    assert fetcher.scripted.requests[2] == {
+        "If-None-Match": '"v2"',
+        "If-Modified-Since": "Tue, 02 Jan 2024 00:00:00 GMT"
+    }
+    assert third.has_state and third.to_state() == second.to_state()
+
+
+def test_not_modified_keeps_new_validators_from_the_server():
+    fetcher = _fetcher(_response(304, ETag='"v3"'))
+    state = {"url": URL, "etag": '"v2"', "last_modified": "Tue, 02 Jan 2024 00:00:00 GMT", "content_hash": "abc"}
+    
+    response = fetcher.fetch(URL, state)
+    assert response.to_state() == {**state, "etag": '"v3"'}
+
+
+def test_errors_do_not_replace_stored_state():
+    assert not _fetcher(_response(500)).fetch(URL).has_state
@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+IMPORT_BUDGET_SECONDS = 2.0
+HEAVY_MODULES = ("docling", "openai", "youtube_transcript_api")
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import app.daily_runner
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def _probe() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_daily_runner_import_skips_heavy_dependencies():
+    assert _probe()["loaded"] == []
+
+
+def test_daily_runner_import_within_budget():
+    elapsed = min(_probe()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_SECONDS, f"import app.daily_runner took {elapsed:.2f}s"
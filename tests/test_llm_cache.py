@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.agent.llm_cache import LLMCache
+from app.database.models import LLMCacheEntry
+
+
+def test_cache_hit_counts_and_normalizes_content(pg_repo):
+    cache = LLMCache(pg_repo, ttl_hours=24)
+    cache.put("model", "1", "Some   content\nhere", '{"title": "t"}')
+    
+    assert cache.get("model", "1", "Some content here") == '{"title": "t"}'
+    assert cache.get("model", "2", "Some content here") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    assert pg_repo.session.query(LLMCacheEntry.hits).scalar() == 1
+
+
+def test_expired_entries_are_not_served_or_touched(pg_repo):
+    cache = LLMCache(pg_repo, ttl_hours=24)
+    cache.put("model", "1", "content", "response")
+    pg_repo.session.execute(update(LLMCacheEntry).values(created_at=datetime.now(timezone.utc) - timedelta(hours=25)))
+    pg_repo.session.commit()
+    
+    assert cache.get("model", "1", "content") is None
+    assert pg_repo.session.query(LLMCacheEntry.hits).scalar() == 0
+    assert cache.evict() == 1
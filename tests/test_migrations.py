@@ -0,0 +1,45 @@
+from sqlalchemy import text
+
+from app.database.migrations import HOT_QUERIES, MIGRATIONS, check_hot_query_plans, get_applied_versions, migrate
+from app.database.models import Base, YouTubeVideo
+
+
+def test_hot_queries_use_their_indexes(pg_engine):
+    Base.metadata.create_all(pg_engine)
+    migrate(pg_engine)
+    
+    assert get_applied_versions(pg_engine) == sorted(version for version, _, _ in MIGRATIONS)
+    plans = check_hot_query_plans(pg_engine)
+    assert plans == {name: True for name in HOT_QUERIES}
+
+
+def test_migrate_is_idempotent(pg_engine):
+    Base.metadata.create_all(pg_engine)
+    migrate(pg_engine)
+    assert migrate(pg_engine) == []
+
+
+def test_compressed_bodies_backfills_legacy_text_columns(pg_repo, pg_engine):
+    long_transcript = "A long transcript sentence. " * 40
+    with pg_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("DELETE FROM schema_migrations WHERE version = 2"))
+        conn.execute(text("ALTER TABLE youtube_videos ALTER COLUMN transcript TYPE TEXT USING NULL"))
+        conn.execute(text(
+            "INSERT INTO youtube_videos (video_id, title, url, channel_id, published_at, created_at, transcript) VALUES "
+            "('long', 't', 'u', 'c', now(), now(), :long), ('short', 't', 'u', 'c', now(), now(), 'hi'), "
+            "('pending', 't', 'u', 'c', now(), now(), NULL)"
+        ), {"long": long_transcript})
+    
+    assert migrate(pg_engine) == [2]
+    
+    with pg_engine.connect() as conn:
+        columns = dict(conn.execute(text(
+            "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'youtube_videos'"
+        )).all())
+        stored = dict(conn.execute(text("SELECT video_id, get_byte(transcript, 0) FROM youtube_videos")).all())
+    assert columns["transcript"] == "bytea"
+    assert "transcript_compressed" not in columns
+    assert stored == {"long": 1, "short": 0, "pending": None}
+    assert pg_repo.session.get(YouTubeVideo, "long").transcript == long_transcript
+    assert pg_repo.session.get(YouTubeVideo, "short").transcript == "hi"
+    assert check_hot_query_plans(pg_engine)["videos_without_transcript"]
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from app.agent import embeddings
+from app.agent.embeddings import RelevancePrefilter, normalize_rows, prefilter_digests, prefilter_digests_per_profile
+
+VECTORS = {
+    "profile": [1.0, 0.0, 0.0],
+    "other profile": [0.0, 1.0, 0.0],
+    "close": [0.9, 0.1, 0.0],
+    "related": [0.5, 0.5, 0.0],
+    "orthogonal": [0.0, 1.0, 0.0],
+    "opposite": [-1.0, 0.0, 0.0],
+}
+
+
+class FixedEmbedder:
+    model = "fixed-3"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return normalize_rows(np.asarray([VECTORS[text.split("\n")[0]] for text in texts], dtype=np.float32))
+
+
+class EmbeddingRepo:
+    def __init__(self):
+        self.vectors = {}
+
+    def get_digest_embeddings(self, digest_ids, model):
+        return {digest_id: self.vectors[digest_id] for digest_id in digest_ids if digest_id in self.vectors}
+
+    def save_digest_embeddings(self, model, vectors):
+        self.vectors.update(vectors)
+        return list(vectors)
+
+
+def _digest(title):
+    return {"id": title, "title": title, "summary": "summary"}
+
+
+def _profile(background, profile_id="p1"):
+    return {"id": profile_id, "name": "Reader", "background": background, "interests": []}
+
+
+DIGESTS = [_digest(title) for title in ("orthogonal", "close", "opposite", "related")]
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    fixed = FixedEmbedder()
+    monkeypatch.setattr(embeddings, "get_embedder", lambda: fixed)
+    monkeypatch.setattr(embeddings, "_prefilters", {})
+    return fixed
+
+
+def test_scores_are_cosine_similarities(embedder):
+    scores = RelevancePrefilter(embedder).score(EmbeddingRepo(), DIGESTS, _profile("profile"))
+    expected = [0.0, 0.9 / np.hypot(0.9, 0.1), -1.0, np.sqrt(0.5)]
+    assert np.allclose(scores, expected, atol=1e-6)
+
+
+def test_top_k_keeps_most_similar_in_score_order(embedder):
+    top = RelevancePrefilter(embedder).top_k(EmbeddingRepo(), DIGESTS, _profile("profile"), 2)
+    assert [d["id"] for d in top] == ["close", "related"]
+
+
+@pytest.mark.parametrize("k", [0, 4, 10])
+def test_top_k_passes_through_without_embedding(embedder, k):
+    assert prefilter_digests(EmbeddingRepo(), DIGESTS, _profile("profile"), k=k) == DIGESTS
+    assert embedder.calls == []
+
+
+def test_embeddings_are_cached_per_digest_and_profile(embedder):
+    repo = EmbeddingRepo()
+    profile = _profile("profile")
+    first = prefilter_digests(repo, DIGESTS, profile, k=2)
+    second = prefilter_digests(repo, DIGESTS, profile, k=2)
+    
+    assert first == second
+    assert embedder.calls == [[f"{d['title']}\nsummary" for d in DIGESTS], ["profile\n"]]
+    
+    prefilter_digests(repo, DIGESTS, _profile("other profile"), k=2)
+    assert embedder.calls[-1] == ["other profile\n"]
+
+
+def test_top_k_per_profile_matches_single_profile_ranking(embedder):
+    repo = EmbeddingRepo()
+    profiles = [_profile("profile", "p1"), _profile("other profile", "p2")]
+    prefilter = RelevancePrefilter(embedder)
+    
+    shortlists = prefilter.top_k_per_profile(repo, DIGESTS, profiles, 2)
+    assert [[d["id"] for d in shortlist] for shortlist in shortlists] == [["close", "related"], ["orthogonal", "related"]]
+    assert shortlists == [prefilter.top_k(repo, DIGESTS, profile, 2) for profile in profiles]
+
+
+def test_prefilter_per_profile_reuses_cached_profile_vectors(embedder):
+    repo = EmbeddingRepo()
+    profiles = [_profile("profile", "p1"), _profile("other profile", "p2")]
+    
+    first = prefilter_digests_per_profile(repo, DIGESTS, profiles, k=2)
+    second = prefilter_digests_per_profile(repo, DIGESTS, profiles, k=2)
+    
+    assert first == second == [prefilter_digests(repo, DIGESTS, profile, k=2) for profile in profiles]
+    assert embedder.calls == [["profile\n", "other profile\n"], [f"{d['title']}\nsummary" for d in DIGESTS]]
+
+
+def test_profile_edits_replace_the_cached_prefilter(embedder):
+    repo = EmbeddingRepo()
+    prefilter_digests(repo, DIGESTS, _profile("profile"), k=2)
+    prefilter_digests(repo, DIGESTS, _profile("other profile"), k=2)
+    prefilter_digests(repo, DIGESTS, _profile("profile", "p2"), k=2)
+    
+    assert set(embeddings._prefilters) == {"p1", "p2"}
+    assert embeddings._prefilters["p1"][1]._profile_vectors.keys() == {"other profile\n"}
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.database import repository
+from app.replay.sources import CapturingSender
+from app.services import process_curator
+from app.services.process_profiles import DEFAULT_PROFILE_ID, deliverable_profiles, send_profile_digests
+
+READER = {
+    "name": "Reader",
+    "title": "Engineer",
+    "background": "Builds retrieval systems",
+    "interests": ["Retrieval-Augmented Generation", "Vector databases"],
+    "preferences": {"prefer_practical": True},
+    "expertise_level": "Advanced"
+}
+
+
+@pytest.fixture
+def responder(replay_llm, pg_repo, pg_engine, monkeypatch):
+    monkeypatch.setattr(repository, "get_session", lambda: Session(bind=pg_engine))
+    for i in range(5):
+        pg_repo.create_digest("youtube", f"v{i}", f"https://example.com/{i}", f"Release {i}", f"Summary of release {i}.")
+    return replay_llm
+
+
+def test_profiles_without_email_are_skipped_except_default():
+    profiles = [
+        {"id": DEFAULT_PROFILE_ID, "email": None},
+        {"id": "alice", "email": "alice@example.com"},
+        {"id": "bob", "email": None},
+        {"id": "carol", "email": ""},
+    ]
+    
+    assert [p["id"] for p in deliverable_profiles(profiles)] == [DEFAULT_PROFILE_ID, "alice"]
+
+
+def test_default_profile_follows_user_profile_edits(pg_repo, monkeypatch):
+    assert process_curator.load_default_profile(pg_repo)["background"] == process_curator.USER_PROFILE["background"]
+    
+    monkeypatch.setattr(process_curator, "USER_PROFILE", {**process_curator.USER_PROFILE, "background": "Edited"})
+    assert process_curator.load_default_profile(pg_repo)["background"] == "Edited"
+    assert [p["id"] for p in process_curator.load_profiles(pg_repo)] == [DEFAULT_PROFILE_ID]
+
+
+def test_profile_digests_share_rankings_between_identical_profiles(pg_repo, responder):
+    pg_repo.save_profiles([
+        {**READER, "id": "alice", "email": "alice@example.com"},
+        {**READER, "id": "bob", "email": "bob@example.com"},
+        {**READER, "id": "carol", "email": None},
+    ])
+    sender = CapturingSender()
+    
+    result = send_profile_digests(hours=24, top_n=3, sender=sender)
+    
+    assert result["sent"] == result["profiles"] == 3
+    assert result["skipped"] == 1
+    assert sorted(str(m["recipients"]) for m in sender.messages) == ["None", "['alice@example.com']", "['bob@example.com']"]
+    assert responder.calls["ScoredDigestList"] == 2
+    assert responder.calls["EmailIntroduction"] == 3
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+from app.agent import llm
+from app.agent.llm import LLMScheduler
+from app.rate_limit import get_bucket
+
+
+def test_buckets_are_shared_only_between_identical_limits():
+    bucket = get_bucket("test:shared", 1.0, 10.0)
+    
+    assert get_bucket("test:shared", 1.0, 10.0) is bucket
+    resized = get_bucket("test:shared", 2.0, 20.0)
+    assert resized is not bucket
+    assert (resized.rate, resized.capacity) == (2.0, 20.0)
+
+
+def test_scheduler_limits_apply_to_its_own_buckets():
+    slow = LLMScheduler(rpm=60, tpm=6000)._buckets("test-model")
+    fast = LLMScheduler(rpm=600, tpm=60000)._buckets("test-model")
+    
+    assert [b.capacity for b in slow] == [60, 6000]
+    assert [b.capacity for b in fast] == [600, 60000]
+
+
+def test_retries_return_their_token_reservation(monkeypatch):
+    monkeypatch.setattr(llm, "_is_retryable", lambda error: True)
+    scheduler = LLMScheduler(rpm=600, tpm=10000, max_retries=2, token_budget=0)
+    monkeypatch.setattr(scheduler, "_backoff", lambda attempt, error: 0.0)
+    attempts = []
+    
+    def request():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("rate limited")
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=100))
+    
+    scheduler.call("digest", "retry-model", 1000, request)
+    
+    assert len(attempts) == 3
+    assert scheduler._buckets("retry-model")[1].tokens > 10000 - 200
@@ -0,0 +1,131 @@
+import socket
+import time
+from functools import partial
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller
+
+from app.services import email
+from app.services.email import SMTPPool, send_email, send_many
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.sessions = []
+        self.messages = []
+    
+    async def handle_DATA(self, server, session, envelope):
+        if not any(s is session for s in self.sessions):
+            self.sessions.append(session)
+        self.messages.append((envelope.rcpt_tos, envelope.content))
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class SMTPServer:
+    def __init__(self):
+        self.handler = RecordingHandler()
+        self.hostname = "127.0.0.1"
+        self.port = _free_port()
+        self.controller = None
+    
+    def start(self):
+        self.controller = Controller(self.handler, hostname=self.hostname, port=self.port)
+        self.controller.start()
+    
+    def stop(self):
+        if self.controller is not None:
+            self.controller.stop()
+            self.controller = None
+    
+    def restart(self):
+        self.stop()
+        self.start()
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+def _pool(server, **kwargs) -> SMTPPool:
+    options = {"security": "none", "password": None, "size": 1, "rate": 1000, "burst": 1000, **kwargs}
+    return SMTPPool(server.hostname, server.port, **options)
+
+
+def test_pool_reuses_connections_up_to_max_messages(smtp_server):
+    handler = smtp_server.handler
+    pool = _pool(smtp_server, max_messages=3)
+    
+    for i in range(7):
+        pool.send("me@example.com", [f"user{i}@example.com"], f"Subject: {i}\n\nbody {i}")
+    pool.close()
+    
+    assert len(handler.messages) == 7
+    assert len(handler.sessions) == 3
+    assert pool._idle == []
+
+
+def test_pool_reconnects_after_server_restart(smtp_server):
+    handler = smtp_server.handler
+    pool = _pool(smtp_server)
+    pool.send("me@example.com", ["a@example.com"], "Subject: first\n\nbody")
+    
+    smtp_server.restart()
+    pool.send("me@example.com", ["b@example.com"], "Subject: second\n\nbody")
+    pool.close()
+    
+    assert [rcpt for rcpt, _ in handler.messages] == [["a@example.com"], ["b@example.com"]]
+    assert len(handler.sessions) == 2
+
+
+class TimingOutSMTP:
+    def __init__(self):
+        self.closed = False
+    
+    def sendmail(self, from_addr, recipients, message):
+        raise socket.timeout("timed out")
+    
+    def close(self):
+        self.closed = True
+
+
+def test_pool_retries_reused_connection_on_timeout(smtp_server):
+    handler = smtp_server.handler
+    pool = _pool(smtp_server)
+    stuck = TimingOutSMTP()
+    pool._idle.append((stuck, 1, time.monotonic()))
+    
+    pool.send("me@example.com", ["a@example.com"], "Subject: retry\n\nbody")
+    pool.close()
+    
+    assert stuck.closed
+    assert [rcpt for rcpt, _ in handler.messages] == [["a@example.com"]]
+
+
+def test_send_many_reports_errors_per_message(smtp_server, monkeypatch):
+    handler = smtp_server.handler
+    monkeypatch.setattr(email, "MY_EMAIL", "me@example.com")
+    pool = _pool(smtp_server, size=2)
+    messages = [
+        {"subject": "one", "body_text": "body", "recipients": ["a@example.com"]},
+        {"subject": "two", "body_text": "body", "recipients": [None]},
+        {"subject": "three", "body_text": "body", "recipients": ["c@example.com"]},
+    ]
+    
+    errors = send_many(messages, partial(send_email, pool=pool), workers=2)
+    pool.close()
+    
+    assert errors[0] is None and errors[2] is None
+    assert isinstance(errors[1], ValueError)
+    assert sorted(rcpt[0] for rcpt, _ in handler.messages) == ["a@example.com", "c@example.com"]
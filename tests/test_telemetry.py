@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+
+from app.agent.telemetry import MODEL_PRICES, LLMTelemetry
+from app.database.models import LLMCall
+
+
+def _response(input_tokens: int, cached_tokens: int, output_tokens: int) -> SimpleNamespace:
+    return SimpleNamespace(usage=SimpleNamespace(
+        input_tokens=input_tokens,
+        input_tokens_details=SimpleNamespace(cached_tokens=cached_tokens),
+        output_tokens=output_tokens
+    ))
+
+
+def _record(telemetry: LLMTelemetry, stage: str, model: str, latency_ms: float, response=None, error=None, retries=0):
+    telemetry.record(stage=stage, model=model, started_at=datetime.now(timezone.utc), latency_ms=latency_ms,
+                     queue_ms=0.0, retries=retries, response=response, error=error)
+
+
+@pytest.fixture
+def telemetry():
+    telemetry = LLMTelemetry()
+    for latency in (40.0, 10.0, 30.0, 20.0):
+        _record(telemetry, "digest", "gpt-4o-mini", latency, _response(1000, 200, 100))
+    _record(telemetry, "curator", "gpt-5.1", 500.0, error=RuntimeError("timeout"), retries=2)
+    return telemetry
+
+
+def test_summary_aggregates_latency_tokens_and_cost(telemetry):
+    summary = telemetry.summary()
+    digest = summary["stages"]["digest"]
+    input_price, cached_price, output_price = MODEL_PRICES["gpt-4o-mini"]
+    
+    assert (digest["calls"], digest["failed"], digest["p50_ms"], digest["p95_ms"]) == (4, 0, 20.0, 40.0)
+    assert (digest["input_tokens"], digest["cached_tokens"], digest["output_tokens"]) == (4000, 800, 400)
+    assert digest["cost_usd"] == pytest.approx(4 * (800 * input_price + 200 * cached_price + 100 * output_price) / 1_000_000)
+    assert summary["stages"]["curator"] == {
+        "calls": 1, "failed": 1, "retries": 2, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0,
+        "cost_usd": 0.0, "p50_ms": 500.0, "p95_ms": 500.0
+    }
+    assert (summary["calls"], summary["failed"], summary["p95_ms"]) == (5, 1, 500.0)
+
+
+class FailingRepo:
+    session = SimpleNamespace(rollback=lambda: None)
+    
+    def save_llm_calls(self, calls):
+        raise RuntimeError("database unavailable")
+
+
+def test_flush_writes_each_call_once(pg_repo, telemetry):
+    assert telemetry.flush(FailingRepo()) == 0
+    assert telemetry.flush(pg_repo) == 5
+    assert telemetry.flush(pg_repo) == 0
+    
+    _record(telemetry, "email", "gpt-4o-mini", 15.0, _response(10, 0, 5))
+    assert telemetry.flush(pg_repo) == 1
+    rows = pg_repo.session.execute(select(LLMCall.stage, func.count()).group_by(LLMCall.stage)).all()
+    assert dict(rows) == {"digest": 4, "curator": 1, "email": 1}
+    assert pg_repo.session.scalar(select(func.count(func.distinct(LLMCall.run_id)))) == 1